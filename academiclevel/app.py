@@ -1,13 +1,28 @@
 from flask import Flask, request, jsonify
 import joblib
+import os
 import pandas as pd
 import numpy as np
+from fast_pipeline import FastPipeline
 
 app = Flask(__name__)
 
 # Load the saved best model pipeline
 best_model = joblib.load("best_model.pkl")
 
+# Predict single rows from the pipeline's fitted scaler and encoders without a DataFrame
+# (check with check_fast_pipeline.py); falls back to the pipeline if it can't be unpacked
+USE_FAST_PATH = os.getenv('USE_FAST_PATH', 'true').lower() == 'true'
+
+def load_fast_pipeline():
+    try:
+        return FastPipeline(best_model)
+    except ValueError as e:
+        app.logger.warning(f"Fast path disabled: {e}")
+        return None
+
+fast_pipeline = load_fast_pipeline() if USE_FAST_PATH else None
+
 # Define the categorical and numeric columns
 categorical_columns = ['Mental Status', 'Gender', 'Extracurricular Activities', 'Family Support',
                        'guardian', 'schoolsup', 'paidClass', 'Parent Education']
@@ -26,12 +41,17 @@ def predict():
         if missing_columns:
             return jsonify({"error": f"Missing columns: {missing_columns}"}), 400
         
-        # Create DataFrame from input
-        input_df = pd.DataFrame([data])
         print(data)
-        
-        # Make prediction using the preloaded model
-        predicted_class = best_model.predict(input_df)
+
+        if fast_pipeline is not None:
+            # Same preprocessing as the pipeline, written straight into a NumPy row
+            predicted_class = fast_pipeline.predict(data)
+        else:
+            # Create DataFrame from input
+            input_df = pd.DataFrame([data])
+
+            # Make prediction using the preloaded model
+            predicted_class = best_model.predict(input_df)
         
         # Convert NumPy int64 to Python int
         predicted_value = int(predicted_class[0]) if isinstance(predicted_class[0], np.integer) else predicted_class[0]
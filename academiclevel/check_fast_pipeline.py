@@ -0,0 +1,72 @@
+"""
+Check that the DataFrame-free fast path predicts exactly what the pipeline does.
+
+Runs every row of Academic.csv through FastPipeline one record at a time, as
+/predict would, and compares the preprocessed rows with the fitted
+ColumnTransformer's output and the predictions with best_model.pkl's.
+Also times single-row requests through both paths on complete records.
+
+Usage:
+  python check_fast_pipeline.py
+  python check_fast_pipeline.py other.csv --model best_model.pkl --timing-rows 500
+"""
+import argparse
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from fast_pipeline import FastPipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fast path with the sklearn pipeline")
+    parser.add_argument("path", nargs="?", default="Academic.csv", help="CSV of input fields to compare on")
+    parser.add_argument("--model", default="best_model.pkl", help="Fitted pipeline to check")
+    parser.add_argument("--target", default="plans", help="Target column to drop from the CSV")
+    parser.add_argument("--timing-rows", type=int, default=200, help="Rows to time single-row requests on")
+    args = parser.parse_args()
+
+    best_model = joblib.load(args.model)
+    fast_pipeline = FastPipeline(best_model)
+
+    data = pd.read_csv(args.path).drop(columns=[args.target], errors="ignore")
+    records = data.to_dict("records")
+
+    reference_rows = best_model.steps[0][1].transform(data)
+    if sparse.issparse(reference_rows):
+        reference_rows = reference_rows.toarray()
+    # transform() reuses its row buffer, so copy each row out before the next call
+    fast_rows = np.vstack([sparse.csr_matrix(fast_pipeline.transform(record)).toarray() for record in records])
+    rows_equal = np.array_equal(reference_rows, fast_rows, equal_nan=True)
+
+    expected = best_model.predict(data)
+    predicted = np.concatenate([fast_pipeline.predict(record) for record in records])
+    mismatches = int(np.count_nonzero(expected != predicted))
+    print(f"{len(records)} rows, preprocessed rows {'identical' if rows_equal else 'DIFFER'}, "
+          f"{mismatches} prediction mismatches")
+
+    # A one-row DataFrame of a record with a missing category has a float column the
+    # encoder can't compare with its string categories, so time on complete records
+    timed = [record for record in records if not any(pd.isna(value) for value in record.values())]
+    timed = timed[:args.timing_rows]
+    start = time.perf_counter()
+    for record in timed:
+        best_model.predict(pd.DataFrame([record]))
+    pipeline_ms = (time.perf_counter() - start) / len(timed) * 1000
+    start = time.perf_counter()
+    for record in timed:
+        fast_pipeline.predict(record)
+    fast_ms = (time.perf_counter() - start) / len(timed) * 1000
+    print(f"Single row: pipeline {pipeline_ms:.2f} ms, fast path {fast_ms:.2f} ms")
+
+    passed = rows_equal and mismatches == 0
+    print("Equivalence check passed" if passed else "Equivalence check FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
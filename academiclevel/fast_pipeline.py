@@ -0,0 +1,105 @@
+import math
+import threading
+import numpy as np
+from scipy import sparse
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+# Dictionary key standing in for every spelling of a missing category (None, NaN)
+MISSING = object()
+
+
+def category_key(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return MISSING
+    return value
+
+
+class FastPipeline:
+    """
+    Single-row predictions of a fitted Pipeline(ColumnTransformer, estimator)
+    without building a DataFrame.
+    The scaler statistics, one-hot positions and column order are read once
+    from the fitted ColumnTransformer (its transformers_ column lists, not the
+    app's), and each request's fields are written straight into a
+    preallocated row that goes to the final estimator.
+    Only StandardScaler and OneHotEncoder (without drop or infrequent
+    categories) are supported; anything else raises ValueError so the caller
+    can keep using the pipeline itself.
+    """
+    def __init__(self, pipeline):
+        if len(pipeline.steps) != 2 or not isinstance(pipeline.steps[0][1], ColumnTransformer):
+            raise ValueError("Expected a Pipeline of a ColumnTransformer and an estimator")
+        preprocessor = pipeline.steps[0][1]
+        self.estimator = pipeline.steps[-1][1]
+        self.sparse_output = bool(getattr(preprocessor, "sparse_output_", False))
+
+        numeric_columns, positions, means, scales = [], [], [], []
+        self.categorical = []  # (column, {category key: position}, raise on unknown)
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            if not all(isinstance(column, str) for column in columns):
+                raise ValueError(f"Transformer {name} selects columns by position, not by name")
+            columns = list(columns)
+
+            if isinstance(transformer, StandardScaler):
+                numeric_columns += columns
+                positions += range(offset, offset + len(columns))
+                means.append(transformer.mean_ if transformer.with_mean else np.zeros(len(columns)))
+                scales.append(transformer.scale_ if transformer.with_std else np.ones(len(columns)))
+                offset += len(columns)
+            elif isinstance(transformer, OneHotEncoder):
+                if transformer.drop is not None or getattr(transformer, "_infrequent_enabled", False):
+                    raise ValueError(f"Transformer {name} drops or groups categories")
+                for column, categories in zip(columns, transformer.categories_):
+                    lookup = {category_key(category): offset + i for i, category in enumerate(categories.tolist())}
+                    self.categorical.append((column, lookup, transformer.handle_unknown == "error"))
+                    offset += len(categories)
+            else:
+                raise ValueError(f"Transformer {name} ({type(transformer).__name__}) is not supported")
+
+        self.numeric_columns = numeric_columns
+        self.numeric_positions = np.array(positions, dtype=np.intp)
+        self.means = np.concatenate(means) if means else np.zeros(0)
+        self.scales = np.concatenate(scales) if scales else np.ones(0)
+        self.columns = numeric_columns + [column for column, _, _ in self.categorical]
+        self.width = offset
+        self._local = threading.local()
+
+    def _row(self):
+        """This thread's preallocated (1, width) row, zeroed"""
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros((1, self.width))
+        else:
+            row.fill(0.0)
+        return row
+
+    def transform(self, record):
+        """
+        The preprocessed (1, width) row of a dict of input fields, as the ColumnTransformer would produce it
+        Raises:
+            KeyError if a field is missing, ValueError if a numeric field isn't a number
+            or a category is unknown to an encoder with handle_unknown='error'
+        """
+        row = self._row()
+        values = row[0]
+        for column, position in zip(self.numeric_columns, self.numeric_positions):
+            value = record[column]
+            values[position] = np.nan if value is None else float(value)
+        values[self.numeric_positions] -= self.means
+        values[self.numeric_positions] /= self.scales
+
+        for column, lookup, raise_unknown in self.categorical:
+            position = lookup.get(category_key(record[column]))
+            if position is not None:
+                values[position] = 1.0
+            elif raise_unknown:
+                raise ValueError(f"Found unknown category {record[column]!r} in column {column!r}")
+        return sparse.csr_matrix(row) if self.sparse_output else row
+
+    def predict(self, record):
+        """The final estimator's prediction for one dict of input fields"""
+        return self.estimator.predict(self.transform(record))
@@ -1,15 +1,25 @@
-from flask import Flask, request, jsonify, send_file
-import tensorflow as tf
+from flask import Flask, Response, request, jsonify, send_file
 import numpy as np
 import cv2
-import librosa
 import joblib
+import io
 import os
+import time
+import uuid
+import subprocess
+import hashlib
 import logging
-from tensorflow.keras.preprocessing import image
-from collections import deque
+import queue
+import threading
+import multiprocessing
+from collections import deque, OrderedDict
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from audio_features import extract_features_from_audio, extract_window_features, frame_features, safe_extract_features
+from inference_backend import load_backend, MicroBatcher, TFLITE_AUDIO_MODEL, TFLITE_FACE_MODEL
+from face_tracking import DEFAULT_CASCADE, FaceTracker
+from metrics import JobMetrics, counters, render_metrics
 
 # Load environment variables
 load_dotenv()
@@ -25,224 +35,1242 @@ app = Flask(__name__)
 AUDIO_MODEL_FOLDER = "weights/audio_model"
 
 FACE_MODEL_PATH = "weights/video_model/best_emotion_model_phase_2.keras"
+
+# Runtime used for both emotion models: "keras" (default) or "tflite".
+# TFLite models are produced from the Keras ones with export_models.py.
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'keras').lower()
+
+# Which models this deployment serves ("audio", "face" or both, comma separated)
+ENABLED_MODELS = {name.strip() for name in os.getenv('ENABLED_MODELS', 'audio,face').lower().split(',') if name.strip()}
+
+# "sync" loads and warms up the models while the module is imported; "background" does it
+# in a thread so the server is live at once and /health/ready reports when it can serve
+MODEL_LOADING = os.getenv('MODEL_LOADING', 'sync').lower()
+TFLITE_MODEL_DIR = os.getenv('TFLITE_MODEL_DIR', 'weights/tflite')
+TFLITE_NUM_THREADS = int(os.getenv('TFLITE_NUM_THREADS', 0)) or None
 IMG_SIZE = 224
 OUTPUT_DIR = "processed_videos"  # Directory to store processed videos
 
+# Number of sampled frames stacked into a single face_model forward pass
+FACE_BATCH_SIZE = int(os.getenv('FACE_BATCH_SIZE', 16))
+
+# Bounded hand-off between the decode, inference and encode stages of process_video.
+# Each queue slot holds one chunk of at most max(FACE_BATCH_SIZE, PIPELINE_CHUNK_FRAMES) frames.
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 2))
+PIPELINE_CHUNK_FRAMES = int(os.getenv('PIPELINE_CHUNK_FRAMES', 32))
+
+# In summary_only mode, seek (CAP_PROP_POS_FRAMES) instead of grab()-ing skipped
+# frames once sample_rate reaches this stride; 0 disables seeking
+VIDEO_SEEK_MIN_STRIDE = int(os.getenv('VIDEO_SEEK_MIN_STRIDE', 60))
+
+# Scene-change skipping (adaptive=true): a sampled frame reuses the last prediction when the
+# mean grey-level difference (0-255) between SCENE_CHANGE_SIZE-pixel thumbnails of it and of
+# the last classified frame is below SCENE_CHANGE_THRESHOLD, at most SCENE_CHANGE_MAX_REUSE
+# times in a row
+SCENE_CHANGE_THRESHOLD = float(os.getenv('SCENE_CHANGE_THRESHOLD', 3.0))
+SCENE_CHANGE_MAX_REUSE = int(os.getenv('SCENE_CHANGE_MAX_REUSE', 15))
+SCENE_CHANGE_SIZE = int(os.getenv('SCENE_CHANGE_SIZE', 32))
+
+# Face crops (faces=true): Haar-cascade detection every FACE_DETECT_INTERVAL sampled frames on a
+# copy downscaled to FACE_DETECT_WIDTH, template tracking in between; crops are widened by
+# FACE_CROP_MARGIN of the face size on each side before classification
+FACE_DETECTION_CASCADE = os.getenv('FACE_DETECTION_CASCADE', DEFAULT_CASCADE)
+FACE_DETECT_INTERVAL = int(os.getenv('FACE_DETECT_INTERVAL', 10))
+FACE_DETECT_WIDTH = int(os.getenv('FACE_DETECT_WIDTH', 320))
+FACE_MAX_FACES = int(os.getenv('FACE_MAX_FACES', 4))
+FACE_CROP_MARGIN = float(os.getenv('FACE_CROP_MARGIN', 0.2))
+
+# Background /process-video jobs: worker threads, pending-queue depth and
+# how many finished jobs are kept around for status/result polling
+VIDEO_JOB_WORKERS = int(os.getenv('VIDEO_JOB_WORKERS', 1))
+VIDEO_JOB_QUEUE_SIZE = int(os.getenv('VIDEO_JOB_QUEUE_SIZE', 8))
+VIDEO_JOB_HISTORY = int(os.getenv('VIDEO_JOB_HISTORY', 100))
+
+# Chunk-parallel processing (parallel=true): the video is split into at most
+# VIDEO_PARALLEL_WORKERS frame ranges of at least VIDEO_PARALLEL_MIN_CHUNK frames,
+# each processed by a worker process with its own face model (0 workers = one per CPU)
+VIDEO_PARALLEL_WORKERS = int(os.getenv('VIDEO_PARALLEL_WORKERS', 0)) or os.cpu_count() or 1
+VIDEO_PARALLEL_MIN_CHUNK = int(os.getenv('VIDEO_PARALLEL_MIN_CHUNK', 300))
+
+# time_budget / target_frames requests: frames timed from the upload to estimate its
+# decode and encode cost, and the share of the budget the plan may use
+VIDEO_BUDGET_PROBE_FRAMES = int(os.getenv('VIDEO_BUDGET_PROBE_FRAMES', 30))
+VIDEO_BUDGET_SAFETY = float(os.getenv('VIDEO_BUDGET_SAFETY', 0.9))
+
+# Cross-request batching for /predict-face: concurrent single-image requests arriving
+# within FACE_MICROBATCH_MAX_WAIT_MS share one forward pass of up to
+# FACE_MICROBATCH_MAX_SIZE images. A max size of 1 disables batching.
+FACE_MICROBATCH_MAX_SIZE = int(os.getenv('FACE_MICROBATCH_MAX_SIZE', 16))
+FACE_MICROBATCH_MAX_WAIT_MS = float(os.getenv('FACE_MICROBATCH_MAX_WAIT_MS', 5))
+
+# Temporal smoothing of per-frame predictions in process_video (see EmotionPredictor)
+SMOOTHING_MODE = os.getenv('SMOOTHING_MODE', 'window')
+SMOOTHING_WINDOW = int(os.getenv('SMOOTHING_WINDOW', 5))
+SMOOTHING_ALPHA = float(os.getenv('SMOOTHING_ALPHA', 0.3))
+
+# /predict-audio-batch: feature-extraction processes (0 = one per CPU) and upload limit
+AUDIO_POOL_WORKERS = int(os.getenv('AUDIO_POOL_WORKERS', 0)) or None
+AUDIO_BATCH_MAX_FILES = int(os.getenv('AUDIO_BATCH_MAX_FILES', 500))
+
+# Cache of /predict-audio results keyed by upload content (size 0 disables it)
+AUDIO_CACHE_SIZE = int(os.getenv('AUDIO_CACHE_SIZE', 256))
+AUDIO_CACHE_TTL = float(os.getenv('AUDIO_CACHE_TTL', 3600))
+
+# /predict-audio-timeline: window length and default hop between windows, in seconds
+AUDIO_TIMELINE_WINDOW = float(os.getenv('AUDIO_TIMELINE_WINDOW', 2.5))
+AUDIO_TIMELINE_HOP = float(os.getenv('AUDIO_TIMELINE_HOP', 0.5))
+
+# Joint audio + face analysis of uploaded videos (with_audio=true): ffmpeg is used to
+# demux the audio track; FUSION_FACE_WEIGHT is the face share of the fused scores
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FUSION_FACE_WEIGHT = float(os.getenv('FUSION_FACE_WEIGHT', 0.5))
+
+EMOTION_LABELS = ['aggressive', 'lazy_nervous', 'normal', 'tired_sleepy']
+
 # Create output directory if it doesn't exist
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Load models at startup
-try:
-    # Load audio emotion recognition model and related components
-    audio_model_path = os.path.join(AUDIO_MODEL_FOLDER, "emotion_classification_model.h5")
-    scaler_path = os.path.join(AUDIO_MODEL_FOLDER, "scaler.pkl")
-    label_encoder_path = os.path.join(AUDIO_MODEL_FOLDER, "label_encoder.pkl")
+# Model state, filled in by load_models() / warmup_models()
+audio_model = None
+scaler = None
+label_encoder = None
+face_model = None
+face_batcher = None
+face_frame_seconds = None  # Per-frame face_model cost in a full batch, measured by warmup_models()
+
+# Per-model readiness and timings reported on /health
+model_status = {
+    name: {"enabled": name in ENABLED_MODELS, "loaded": False, "warmed_up": False,
+           "load_seconds": None, "warmup_seconds": None, "error": None}
+    for name in ("audio", "face")
+}
+
+def load_models():
+    """Load the models listed in ENABLED_MODELS with the configured backend"""
+    global audio_model, scaler, label_encoder, face_model, face_batcher
+
+    if model_status["audio"]["enabled"]:
+        start = time.perf_counter()
+        try:
+            # Load audio emotion recognition model and related components
+            audio_model_path = os.path.join(AUDIO_MODEL_FOLDER, "emotion_classification_model.h5")
+            scaler_path = os.path.join(AUDIO_MODEL_FOLDER, "scaler.pkl")
+            label_encoder_path = os.path.join(AUDIO_MODEL_FOLDER, "label_encoder.pkl")
+
+            scaler = joblib.load(scaler_path)
+            label_encoder = joblib.load(label_encoder_path)
+            audio_model = load_backend(INFERENCE_BACKEND, audio_model_path, TFLITE_MODEL_DIR,
+                                       TFLITE_AUDIO_MODEL, num_threads=TFLITE_NUM_THREADS)
+
+            model_status["audio"]["loaded"] = True
+            logger.info(f"Audio model loaded successfully from {audio_model.model_path} ({INFERENCE_BACKEND})")
+        except Exception as e:
+            logger.error(f"Error loading audio model: {str(e)}")
+            model_status["audio"]["error"] = str(e)
+        model_status["audio"]["load_seconds"] = time.perf_counter() - start
+
+    if model_status["face"]["enabled"]:
+        start = time.perf_counter()
+        try:
+            # Load facial emotion recognition model
+            face_model = load_backend(INFERENCE_BACKEND, FACE_MODEL_PATH, TFLITE_MODEL_DIR,
+                                      TFLITE_FACE_MODEL, num_threads=TFLITE_NUM_THREADS)
+            if FACE_MICROBATCH_MAX_SIZE > 1:
+                face_batcher = MicroBatcher(face_model.predict,
+                                            max_batch_size=FACE_MICROBATCH_MAX_SIZE,
+                                            max_wait_ms=FACE_MICROBATCH_MAX_WAIT_MS)
+
+            model_status["face"]["loaded"] = True
+            logger.info(f"Facial model loaded successfully from {face_model.model_path} ({INFERENCE_BACKEND})")
+        except Exception as e:
+            logger.error(f"Error loading facial model: {str(e)}")
+            model_status["face"]["error"] = str(e)
+        model_status["face"]["load_seconds"] = time.perf_counter() - start
+
+def warmup_models():
+    """
+    Run one dummy forward pass per loaded model so graph tracing and kernel
+    selection happen before the first real request. The audio warmup also
+    exercises the librosa feature path. The face warmup also times a full
+    FACE_BATCH_SIZE batch, which plan_sampling uses as the per-frame model cost.
+    """
+    global face_frame_seconds
+
+    if audio_model is not None:
+        start = time.perf_counter()
+        try:
+            frame_features(np.zeros(22050 * 3, dtype=np.float32), 22050)
+            audio_model.predict(np.zeros((1, 32, 1), dtype=np.float32))
+            model_status["audio"]["warmed_up"] = True
+        except Exception as e:
+            logger.error(f"Error warming up audio model: {str(e)}")
+            model_status["audio"]["error"] = str(e)
+        model_status["audio"]["warmup_seconds"] = time.perf_counter() - start
+
+    if face_model is not None:
+        start = time.perf_counter()
+        try:
+            face_model.predict(np.zeros((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+            batch_start = time.perf_counter()
+            face_model.predict(np.zeros((FACE_BATCH_SIZE, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+            face_frame_seconds = (time.perf_counter() - batch_start) / FACE_BATCH_SIZE
+            model_status["face"]["warmed_up"] = True
+        except Exception as e:
+            logger.error(f"Error warming up facial model: {str(e)}")
+            model_status["face"]["error"] = str(e)
+        model_status["face"]["warmup_seconds"] = time.perf_counter() - start
+
+    logger.info("Model warmup complete: " + ", ".join(
+        f"{name} load {status['load_seconds'] or 0:.2f}s / warmup {status['warmup_seconds'] or 0:.2f}s"
+        for name, status in model_status.items() if status["enabled"]))
+
+def models_ready():
+    """True once every enabled model is loaded and warmed up"""
+    return all(status["warmed_up"] for status in model_status.values() if status["enabled"])
+
+def model_unavailable(name):
+    """Error response for endpoints whose model is disabled or not ready yet, else None"""
+    status = model_status[name]
+    if not status["enabled"]:
+        return jsonify({"error": f"The {name} model is not enabled in this deployment"}), 503
+    if not status["loaded"]:
+        return jsonify({"error": f"The {name} model is not available", "detail": status["error"]}), 503
+    return None
+
+def start_models():
+    """Load and warm up the models, in a background thread if MODEL_LOADING=background"""
+    def load_and_warmup():
+        load_models()
+        warmup_models()
+
+    if MODEL_LOADING == "background":
+        threading.Thread(target=load_and_warmup, name="model-loader", daemon=True).start()
+    else:
+        load_and_warmup()
 
-    audio_model = tf.keras.models.load_model(audio_model_path)
-    scaler = joblib.load(scaler_path)
-    label_encoder = joblib.load(label_encoder_path)
+# Spawned worker processes (see get_video_pool) re-import this module; they load
+# their own model in _init_video_worker instead
+if multiprocessing.parent_process() is None:
+    start_models()
 
-    logger.info(f"Audio model loaded successfully from {audio_model_path}")
+# Mapping from the audio model's labels to the vocabulary returned by the API
+EMOTION_MAPPING = {
+    "fear": "nervous",
+    "angry": "aggressive",
+    "bored": "lazy",
+    "neutral": "natural"
+}
 
-    # Load facial emotion recognition model
-    face_model = tf.keras.models.load_model(FACE_MODEL_PATH)
-    logger.info(f"Facial model loaded successfully from {FACE_MODEL_PATH}")
+# Define Audio processing functions
+def scale_audio_features(features):
+    """Scale a list of 32-dim feature vectors and reshape them for the CNN-LSTM => (n, 32, 1)"""
+    features_scaled = scaler.transform(features)
+    return np.reshape(features_scaled, (features_scaled.shape[0], features_scaled.shape[1], 1))
 
-except Exception as e:
-    logger.error(f"Error loading models: {str(e)}")
-    audio_model = None
-    face_model = None
+def predict_scaled_audio(features_scaled):
+    """
+    Classify scaled (n, 32, 1) audio features with one audio_model pass
+    Returns:
+        List of (mapped emotion, confidence) tuples in input order
+    """
+    predictions = audio_model.predict(features_scaled)
+    predicted_emotions = label_encoder.inverse_transform(np.argmax(predictions, axis=1))
+
+    return [(EMOTION_MAPPING.get(emotion, emotion), float(np.max(probs)))
+            for emotion, probs in zip(predicted_emotions, predictions)]
+
+def predict_audio_features(features):
+    """Classify a list of unscaled 32-dim feature vectors, see predict_scaled_audio"""
+    return predict_scaled_audio(scale_audio_features(features))
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry time-to-live and hit/miss counters"""
+    def __init__(self, max_entries=256, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self.entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+# Audio results keyed by a hash of the uploaded bytes. Each entry holds the
+# scaled 32-dim feature vector and the final prediction.
+audio_cache = LRUCache(max_entries=AUDIO_CACHE_SIZE, ttl_seconds=AUDIO_CACHE_TTL)
+
+def audio_cache_key(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+_audio_pool = None
+_audio_pool_lock = threading.Lock()
+
+def get_audio_pool():
+    """
+    Process pool for librosa feature extraction, created on first use.
+    Spawned like the video pool: forking would copy TensorFlow and the running
+    micro-batcher, job and Flask threads into the workers.
+    """
+    global _audio_pool
+    with _audio_pool_lock:
+        if _audio_pool is None:
+            _audio_pool = ProcessPoolExecutor(max_workers=AUDIO_POOL_WORKERS,
+                                              mp_context=multiprocessing.get_context("spawn"))
+    return _audio_pool
+
+def predict_audio_sources(sources):
+    """
+    Classify many audio files, extracting features in parallel and predicting in one batch
+    Uploads (raw bytes) seen before are answered from audio_cache without decoding.
+    Args:
+        sources: File paths or raw file bytes
+    Returns:
+        List of dicts with either "emotion" and "confidence" or "error", in input order
+    """
+    keys = [audio_cache_key(source) if isinstance(source, bytes) else None for source in sources]
+    results = [None] * len(sources)
 
-# Define Audio processing functions
-def extract_features_from_audio(filepath, n_mfcc=30):
-    """Extract audio features for emotion prediction"""
-    data, sr = librosa.load(filepath, duration=2.5, offset=0.6)
-    zcr = np.mean(librosa.feature.zero_crossing_rate(y=data))
-    rmse = np.mean(librosa.feature.rms(y=data))
-    mfccs = np.mean(librosa.feature.mfcc(y=data, sr=sr, n_mfcc=n_mfcc).T, axis=0)
-    features = np.hstack((zcr, rmse, mfccs))
-    return features
+    for i, key in enumerate(keys):
+        cached = audio_cache.get(key) if key is not None else None
+        if cached is not None:
+            results[i] = {"emotion": cached["emotion"], "confidence": cached["confidence"]}
+
+    misses = [i for i, result in enumerate(results) if result is None]
+    if not misses:
+        return results
+
+    # A single file is cheaper to decode here than to ship to the pool
+    if len(misses) == 1:
+        extracted = [safe_extract_features(sources[misses[0]])]
+    else:
+        extracted = list(get_audio_pool().map(safe_extract_features, [sources[i] for i in misses]))
+
+    ok = []
+    for i, (features, error) in zip(misses, extracted):
+        if features is None:
+            results[i] = {"error": error}
+        else:
+            ok.append((i, features))
+
+    if ok:
+        features_scaled = scale_audio_features([features for _, features in ok])
+        predictions = predict_scaled_audio(features_scaled)
+        for (i, _), row, (emotion, confidence) in zip(ok, features_scaled, predictions):
+            results[i] = {"emotion": emotion, "confidence": confidence}
+            if keys[i] is not None:
+                audio_cache.put(keys[i], {"features_scaled": row.ravel(),
+                                          "emotion": emotion,
+                                          "confidence": confidence})
+
+    return results
 
 # Define Face processing functions
 def preprocess_image(img):
     """Preprocess image for facial emotion prediction"""
     if isinstance(img, str):
+        # TensorFlow is only imported for this path-based helper
+        from tensorflow.keras.preprocessing import image
+
         img = image.load_img(img, target_size=(IMG_SIZE, IMG_SIZE))
         img = image.img_to_array(img)
     else:
         img = cv2.resize(img, (IMG_SIZE, IMG_SIZE))
 
-    img_array = np.expand_dims(img, axis=0)
-    img_array = tf.keras.applications.mobilenet_v2.preprocess_input(img_array)
+    # Same scaling as mobilenet_v2.preprocess_input: [0, 255] -> [-1, 1]
+    img_array = np.expand_dims(img, axis=0).astype(np.float32)
+    img_array /= 127.5
+    img_array -= 1.0
     return img_array
 
+def preprocess_batch(frames):
+    """Resize a list of RGB frames and stack them into one MobileNetV2 input tensor"""
+    batch = np.empty((len(frames), IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        batch[i] = cv2.resize(frame, (IMG_SIZE, IMG_SIZE))
+
+    # Same scaling as mobilenet_v2.preprocess_input, done in place: [0, 255] -> [-1, 1]
+    batch /= 127.5
+    batch -= 1.0
+    return batch
+
 def predict_face_emotion(img):
     """Predict emotion from facial image"""
     preprocessed_image = preprocess_image(img)
     predictions = face_model.predict(preprocessed_image)
     predicted_class = np.argmax(predictions[0])
 
-    emotion_labels = ['aggressive', 'lazy_nervous', 'normal', 'tired_sleepy']
-    predicted_emotion = emotion_labels[predicted_class]
+    predicted_emotion = EMOTION_LABELS[predicted_class]
 
     return predicted_emotion, predictions[0]
 
+def predict_face_emotion_batch(frames, metrics=None):
+    """
+    Predict emotions for a list of RGB frames with a single forward pass
+    Returns:
+        List of (emotion, probabilities) tuples in the same order as frames
+    """
+    if not frames:
+        return []
+
+    metrics = metrics if metrics is not None else JobMetrics()
+    with metrics.time("preprocess"):
+        batch = preprocess_batch(frames)
+    with metrics.time("inference"):
+        predictions = face_model.predict(batch)
+    metrics.count("frames_inferred", len(frames))
+    predicted_classes = np.argmax(predictions, axis=1)
+
+    return [(EMOTION_LABELS[cls], probs) for cls, probs in zip(predicted_classes, predictions)]
+
 class EmotionPredictor:
-    """Class for temporal smoothing of predictions"""
-    def __init__(self, window_size=5):
+    """
+    Class for temporal smoothing of predictions
+    mode="window": most frequent emotion and mean probabilities over the last
+        window_size frames, kept as running per-label counts and probability sums
+        so each update costs the same whatever the window size
+    mode="ema": exponential moving average of the probabilities with factor
+        alpha; the emotion is the arg-max of the smoothed probabilities
+    The probabilities returned by get_smooth_prediction live in a buffer that is
+    reused on the next call; copy them if they need to outlive it.
+    """
+    # Recompute the running sum from the ring buffer every N updates so
+    # floating-point drift cannot build up over long sessions
+    RESYNC_INTERVAL = 1024
+
+    def __init__(self, window_size=5, mode="window", alpha=0.3):
+        if mode not in ("window", "ema"):
+            raise ValueError(f"Unknown smoothing mode '{mode}', expected 'window' or 'ema'")
+
         self.emotion_history = deque(maxlen=window_size)
-        self.prob_history = deque(maxlen=window_size)
         self.window_size = window_size
-        self.emotion_labels = ['aggressive', 'lazy_nervous', 'normal', 'tired_sleepy']
+        self.mode = mode
+        self.alpha = alpha
+        self.emotion_labels = EMOTION_LABELS
+        self.label_counts = dict.fromkeys(EMOTION_LABELS, 0)
+        self.updates = 0
+
+        # Allocated on the first update, once the number of classes is known
+        self.prob_ring = None  # Last window_size probability vectors, oldest at next_slot once full
+        self.prob_sum = None
+        self.smooth_probs = None
+        self.next_slot = 0
+
+    def _allocate(self, num_classes):
+        self.prob_ring = np.zeros((self.window_size, num_classes))
+        self.prob_sum = np.zeros(num_classes)
+        self.smooth_probs = np.zeros(num_classes)
 
     def update(self, emotion, probs):
+        if self.prob_ring is None:
+            self._allocate(len(probs))
+
+        if self.mode == "ema":
+            if self.updates == 0:
+                self.smooth_probs[:] = probs
+            else:
+                # smooth += alpha * (probs - smooth), using prob_sum as scratch space
+                np.subtract(probs, self.smooth_probs, out=self.prob_sum)
+                self.prob_sum *= self.alpha
+                self.smooth_probs += self.prob_sum
+            self.updates += 1
+            return
+
+        slot = self.prob_ring[self.next_slot]
+
+        # Evict the oldest frame once the window is full
+        if len(self.emotion_history) == self.window_size:
+            self.label_counts[self.emotion_history[0]] -= 1
+            self.prob_sum -= slot
+
         self.emotion_history.append(emotion)
-        self.prob_history.append(probs)
+        self.label_counts[emotion] = self.label_counts.get(emotion, 0) + 1
+        slot[:] = probs
+        self.prob_sum += slot
+        self.next_slot = (self.next_slot + 1) % self.window_size
+
+        self.updates += 1
+        if self.updates % self.RESYNC_INTERVAL == 0:
+            np.sum(self.prob_ring[:len(self.emotion_history)], axis=0, out=self.prob_sum)
 
     def get_smooth_prediction(self):
-        if not self.emotion_history:
+        if self.updates == 0:
             return None, None
 
-        # Get most frequent emotion
-        emotion = max(set(self.emotion_history), key=self.emotion_history.count)
+        if self.mode == "ema":
+            return self.emotion_labels[int(np.argmax(self.smooth_probs))], self.smooth_probs
+
+        # Get most frequent emotion (ties go to the label listed first)
+        emotion = max(self.label_counts, key=self.label_counts.get)
 
         # Average probabilities
-        avg_probs = np.mean(self.prob_history, axis=0)
+        np.divide(self.prob_sum, len(self.emotion_history), out=self.smooth_probs)
+
+        return emotion, self.smooth_probs
+
+_STAGE_DONE = object()  # Sentinel marking the end of a pipeline stage's output
+_REUSE_PREDICTION = object()  # Chunk entry marker: sampled frame that reuses the last prediction
+
+def _queue_put(q, item, stop):
+    """Put item on a bounded queue, giving up if the pipeline is being stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _queue_get(q, stop):
+    """Get the next item from a queue, returning _STAGE_DONE if the pipeline is being stopped"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _STAGE_DONE
+
+def skip_to_next_sample(cap, frame_number, sample_rate, use_seek=False):
+    """
+    Move the capture from frame_number to just before the next sampled frame
+    without converting the frames in between.
+    grab() still demuxes and decodes each skipped packet but skips the colour
+    conversion and copy; seeking lets the demuxer jump to the nearest keyframe,
+    which is cheaper when the stride is longer than the keyframe interval.
+    Returns:
+        False if the end of the video was reached
+    """
+    if use_seek:
+        return cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number + sample_rate - 1)
+
+    for _ in range(sample_rate - 1):
+        if not cap.grab():
+            return False
+    return True
+
+def scene_thumbnail(frame):
+    """Small greyscale copy of a BGR frame for scene-change scoring"""
+    small = cv2.resize(frame, (SCENE_CHANGE_SIZE, SCENE_CHANGE_SIZE), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+def scene_change_score(thumbnail, reference):
+    """Mean absolute grey-level difference (0-255) between two thumbnails"""
+    return float(np.mean(cv2.absdiff(thumbnail, reference)))
+
+def crop_faces(frame, faces):
+    """RGB crops of a BGR frame around tracked faces, widened by FACE_CROP_MARGIN"""
+    height, width = frame.shape[:2]
+    crops = []
+    for face_id, (x, y, w, h) in faces:
+        margin_x, margin_y = int(w * FACE_CROP_MARGIN), int(h * FACE_CROP_MARGIN)
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1, y1 = min(width, x + w + margin_x), min(height, y + h + margin_y)
+        if x1 > x0 and y1 > y0:
+            crops.append((face_id, (x, y, w, h), cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)))
+    return crops
+
+def smoothing_memory():
+    """Number of past sampled frames that noticeably affect EmotionPredictor's output"""
+    if SMOOTHING_MODE == "ema" and 0 < SMOOTHING_ALPHA < 1:
+        # Frames older than this weigh less than 0.1% of the EMA
+        return int(np.ceil(np.log(1e-3) / np.log(1 - SMOOTHING_ALPHA)))
+    return SMOOTHING_WINDOW
+
+def annotate_frame(frame, smooth_emotion, smooth_probs):
+    """Draw the smoothed emotion and class probabilities onto a BGR frame"""
+    # Prepare probability text with smoothed predictions
+    prob_text = f"Probabilities:"
+    for label, prob in zip(EMOTION_LABELS, smooth_probs):
+        prob_text += f"\n{label}: {prob:.2f}"
+
+    # Add text to frame
+    frame = cv2.putText(frame, f"Emotion: {smooth_emotion}", (10, 30),
+                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+    y = 70
+    for line in prob_text.split('\n'):
+        frame = cv2.putText(frame, line, (10, y),
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        y += 30
+
+    return frame
+
+def annotate_faces(frame, faces):
+    """Draw a box and the smoothed emotion of each (face id, box, emotion) onto a BGR frame"""
+    for face_id, (x, y, w, h), emotion in faces:
+        frame = cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 200, 0), 2)
+        frame = cv2.putText(frame, f"#{face_id} {emotion}", (x, max(15, y - 8)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 200, 0), 2)
+    return frame
+
+def default_output_path():
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(OUTPUT_DIR, f"processed_video_{timestamp}.mp4")
+
+def emotion_distribution(emotion_counts, processed_frames):
+    """Dominant emotion and percentage per emotion from smoothed emotion counts"""
+    # Calculate dominant emotion
+    dominant_emotion = max(emotion_counts.items(), key=lambda x: x[1])[0] if processed_frames > 0 else "unknown"
 
-        return emotion, avg_probs
+    # Calculate percentages
+    emotion_percentages = {}
+    for emotion, count in emotion_counts.items():
+        if processed_frames > 0:
+            emotion_percentages[emotion] = (count / processed_frames) * 100
+        else:
+            emotion_percentages[emotion] = 0
 
-def process_video(video_path, output_path=None, sample_rate=1):
+    return dominant_emotion, emotion_percentages
+
+def summarize_emotions(emotion_counts, processed_frames, total_frames, output_path):
+    """Build the process_video summary from the smoothed emotion counts"""
+    dominant_emotion, emotion_percentages = emotion_distribution(emotion_counts, processed_frames)
+    return {
+        "processed_frames": processed_frames,
+        "total_frames": total_frames,
+        "dominant_emotion": dominant_emotion,
+        "emotion_distribution": emotion_percentages,
+        "emotion_counts": emotion_counts,
+        "processed_video_path": output_path
+    }
+
+def adaptive_sampling_stats(processed_frames, reused_frames):
+    """Summary entry for adaptive mode: how many model inferences scene-change skipping saved"""
+    return {
+        "inferred_frames": processed_frames - reused_frames,
+        "reused_frames": reused_frames,
+        "inferences_saved_percent": reused_frames / processed_frames * 100 if processed_frames else 0.0
+    }
+
+def summarize_faces(face_stats):
+    """Per-face summary entries from process_video's face_stats"""
+    faces = []
+    for face_id, stats in sorted(face_stats.items()):
+        dominant_emotion, emotion_percentages = emotion_distribution(stats["emotion_counts"], stats["frames"])
+        faces.append({
+            "face_id": face_id,
+            "first_frame": stats["first_frame"],
+            "last_frame": stats["last_frame"],
+            "processed_frames": stats["frames"],
+            "dominant_emotion": dominant_emotion,
+            "emotion_distribution": emotion_percentages,
+            "emotion_counts": stats["emotion_counts"]
+        })
+    return faces
+
+def process_video(video_path, output_path=None, sample_rate=1, batch_size=FACE_BATCH_SIZE,
+                  progress_callback=None, summary_only=False, record_timeline=False, metrics=None,
+                  frame_range=None, adaptive=False, faces=False):
     """
     Process video and save annotated result
     Args:
         video_path: Path to input video
         output_path: Path to save annotated video (optional)
         sample_rate: Process 1 frame every N frames (for speed)
+        batch_size: Number of sampled frames classified per forward pass
+        progress_callback: Called as progress_callback(frame_count, total_frames) after each chunk (optional)
+        summary_only: Only compute the emotion summary; no annotation and no output video
+        record_timeline: Add the smoothed emotion of every processed frame to the summary as
+            "frame_timeline", a list of (frame number, seconds, emotion)
+        metrics: JobMetrics receiving per-stage timings and frame counters (optional)
+        frame_range: (start, end) to only process frames start < n <= end (end None = until
+            the end of the video). The sampled frames just before start are classified too,
+            without being counted or written, so the smoothing matches a full run.
+        adaptive: Only classify sampled frames where the scene changed (see SCENE_CHANGE_THRESHOLD)
+            and reuse the last prediction for the others; the summary gets "adaptive_sampling"
+        faces: Classify crops of the faces found by a FaceTracker instead of the whole frame
+            (frames without a face are still classified whole). The frame emotion follows the
+            largest face; every face is smoothed on its own and listed in the summary's "faces"
     Returns:
-        Path to the processed video and summary of emotions
+        Path to the processed video (None if summary_only) and summary of emotions
     """
     if not os.path.exists(video_path):
         logger.error(f"Error: Video not found at {video_path}")
         raise FileNotFoundError(f"Video not found at {video_path}")
 
+    batch_size = max(1, int(batch_size))
+    metrics = metrics if metrics is not None else JobMetrics()
+
     # Open video
     cap = cv2.VideoCapture(video_path)
 
-    # Get video properties
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    # Get video properties; keep the fractional frame rate (29.97) so timeline seconds
+    # stay aligned with the audio segments, the writer takes a whole number
+    fps = cap.get(cv2.CAP_PROP_FPS)
     frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
     # Prepare output video writer
-    if not output_path:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = os.path.join(OUTPUT_DIR, f"processed_video_{timestamp}.mp4")
+    if summary_only:
+        output_path = None
+        out = None
+    else:
+        if not output_path:
+            output_path = default_output_path()
 
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_path, fourcc, fps, (frame_width, frame_height))
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(output_path, fourcc, int(fps), (frame_width, frame_height))
 
-    frame_count = 0
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+    # Start enough sampled frames before the range to fill the smoothing state;
+    # prime_from stays a multiple of sample_rate so skip_to_next_sample lines up
+    start_frame, end_frame = frame_range or (0, None)
+    prime_from = max(0, (start_frame // sample_rate - smoothing_memory()) * sample_rate)
+    if prime_from > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, prime_from)
+
     # Initialize emotion predictor for smooth predictions
-    predictor = EmotionPredictor(window_size=5)
+    predictor = EmotionPredictor(window_size=SMOOTHING_WINDOW, mode=SMOOTHING_MODE, alpha=SMOOTHING_ALPHA)
+
+    tracker = None
+    face_predictors = {}  # face id -> EmotionPredictor
+    face_stats = {}  # face id -> frames, first/last frame and smoothed emotion counts
+    if faces:
+        tracker = FaceTracker(FACE_DETECTION_CASCADE, detect_interval=FACE_DETECT_INTERVAL,
+                              detect_width=FACE_DETECT_WIDTH, max_faces=FACE_MAX_FACES)
 
     # Track emotion distribution for summary
-    emotion_counts = {
-        'aggressive': 0,
-        'lazy_nervous': 0,
-        'normal': 0,
-        'tired_sleepy': 0
-    }
+    emotion_counts = {label: 0 for label in EMOTION_LABELS}
 
     processed_frames = 0
-
+    reused_frames = 0
+    frame_timeline = []
+
+    # The video is processed by three stages connected with bounded queues:
+    #   decode (thread)    -> cap.read(), BGR->RGB for sampled frames
+    #   inference (thread) -> one face_model pass per chunk
+    #   encode (caller)    -> smoothing, putText and VideoWriter, in frame order
+    # Each stage has a single worker and the queues are FIFO, so frame order is
+    # preserved, and at most PIPELINE_QUEUE_SIZE chunks wait between two stages.
+    # In summary_only mode skipped frames are dropped by the decoder and the
+    # last stage only does the smoothing. In adaptive mode the decoder marks
+    # sampled frames without a scene change with _REUSE_PREDICTION instead of
+    # converting them, and the last stage repeats the previous prediction. With
+    # faces the decoder replaces the RGB frame by a list of face crops, which the
+    # inference stage batches with the rest of the chunk.
+    chunk_frames = max(batch_size, PIPELINE_CHUNK_FRAMES)
+    use_seek = 0 < VIDEO_SEEK_MIN_STRIDE <= sample_rate
+    decoded = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    inferred = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    errors = []
+
+    def decode_stage():
+        """Read frames and group them into chunks holding up to batch_size sampled frames"""
+        frame_number = prime_from
+        # Each entry is (frame_number, bgr_frame, rgb_frame, a list of (face id, box, rgb_crop),
+        # None for skipped frames or _REUSE_PREDICTION)
+        chunk = []
+        sampled = 0
+        reference = None  # Thumbnail of the last frame sent to the model
+        reused = 0
+        try:
+            while cap.isOpened() and not stop.is_set():
+                # Without an output video the skipped frames are never needed, so
+                # advance to the next sampled frame without retrieving them
+                with metrics.time("decode"):
+                    if summary_only and sample_rate > 1:
+                        if not skip_to_next_sample(cap, frame_number, sample_rate, use_seek):
+                            break
+                        frame_number += sample_rate - 1
+
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+
+                frame_number += 1
+                if end_frame is not None and frame_number > end_frame:
+                    break
+                metrics.count("frames_decoded")
+
+                # Process only every Nth frame for efficiency
+                if frame_number % sample_rate != 0:
+                    if not summary_only and frame_number > start_frame:
+                        chunk.append((frame_number, frame, None))
+                else:
+                    unchanged = False
+                    if adaptive:
+                        with metrics.time("scene_change"):
+                            thumbnail = scene_thumbnail(frame)
+                            unchanged = (reference is not None and reused < SCENE_CHANGE_MAX_REUSE and
+                                         scene_change_score(thumbnail, reference) < SCENE_CHANGE_THRESHOLD)
+
+                    if unchanged:
+                        chunk.append((frame_number, frame, _REUSE_PREDICTION))
+                        reused += 1
+                    else:
+                        if adaptive:
+                            reference = thumbnail
+                            reused = 0
+
+                        crops = None
+                        if tracker is not None:
+                            with metrics.time("face_tracking"):
+                                crops = crop_faces(frame, tracker.update(frame))
+                        if crops:
+                            chunk.append((frame_number, frame, crops))
+                            sampled += len(crops)
+                        else:
+                            # Convert to RGB for prediction
+                            chunk.append((frame_number, frame, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+                            sampled += 1
+
+                if sampled >= batch_size or len(chunk) >= chunk_frames:
+                    if not _queue_put(decoded, chunk, stop):
+                        return
+                    chunk = []
+                    sampled = 0
+
+            # Hand over whatever is left from the last partial chunk
+            if chunk:
+                _queue_put(decoded, chunk, stop)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            _queue_put(decoded, _STAGE_DONE, stop)
+
+    def inference_stage():
+        """Classify the sampled frames of each chunk with a single forward pass"""
+        try:
+            while True:
+                chunk = _queue_get(decoded, stop)
+                if chunk is _STAGE_DONE:
+                    break
+                inputs = []
+                for _, _, rgb in chunk:
+                    if isinstance(rgb, list):
+                        inputs.extend(crop for _, _, crop in rgb)
+                    elif rgb is not None and rgb is not _REUSE_PREDICTION:
+                        inputs.append(rgb)
+                results = predict_face_emotion_batch(inputs, metrics)
+                if not _queue_put(inferred, (chunk, results), stop):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            _queue_put(inferred, _STAGE_DONE, stop)
+
+    workers = [threading.Thread(target=decode_stage, name="process-video-decode", daemon=True),
+               threading.Thread(target=inference_stage, name="process-video-infer", daemon=True)]
+    for worker in workers:
+        worker.start()
+
+    last_prediction = None
+    last_face_results = []
     try:
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
+        while True:
+            item = inferred.get()
+            if item is _STAGE_DONE:
                 break
 
-            frame_count += 1
-
-            # Process only every Nth frame for efficiency
-            if frame_count % sample_rate != 0:
-                out.write(frame)  # Write the original frame
-                continue
+            chunk, results = item
+            results = iter(results)
+
+            for frame_count, frame, frame_rgb in chunk:
+                if frame_rgb is None:
+                    with metrics.time("encode"):
+                        out.write(frame)  # Write the original frame
+                    continue
+
+                if frame_rgb is _REUSE_PREDICTION:
+                    emotion, probs = last_prediction
+                elif isinstance(frame_rgb, list):
+                    # (face id, box, emotion, probs), largest face first
+                    last_face_results = [(face_id, box) + tuple(next(results)) for face_id, box, _ in frame_rgb]
+                    emotion, probs = last_prediction = last_face_results[0][2:]
+                else:
+                    emotion, probs = last_prediction = next(results)
+                    last_face_results = []
+
+                # Update predictor with new prediction
+                predictor.update(emotion, probs)
+                for face_id, _, face_emotion, face_probs in last_face_results:
+                    if face_id not in face_predictors:
+                        face_predictors[face_id] = EmotionPredictor(window_size=SMOOTHING_WINDOW,
+                                                                    mode=SMOOTHING_MODE, alpha=SMOOTHING_ALPHA)
+                    face_predictors[face_id].update(face_emotion, face_probs)
+                if frame_count <= start_frame:
+                    continue  # Only primes the smoothing for frame_range
+                processed_frames += 1
+                reused_frames += frame_rgb is _REUSE_PREDICTION
+
+                # Get smooth prediction
+                smooth_emotion, smooth_probs = predictor.get_smooth_prediction()
+
+                if smooth_emotion is not None:
+                    # Update emotion counts for summary
+                    emotion_counts[smooth_emotion] += 1
+                    if record_timeline:
+                        frame_timeline.append((frame_count, frame_count / fps if fps > 0 else 0.0, smooth_emotion))
+                    if not summary_only:
+                        with metrics.time("annotate"):
+                            frame = annotate_frame(frame, smooth_emotion, smooth_probs)
+
+                face_labels = []
+                for face_id, box, _, _ in last_face_results:
+                    face_emotion, _ = face_predictors[face_id].get_smooth_prediction()
+                    stats = face_stats.setdefault(face_id, {"frames": 0, "first_frame": frame_count,
+                                                            "emotion_counts": dict.fromkeys(EMOTION_LABELS, 0)})
+                    stats["frames"] += 1
+                    stats["last_frame"] = frame_count
+                    stats["emotion_counts"][face_emotion] += 1
+                    face_labels.append((face_id, box, face_emotion))
+                if face_labels and not summary_only:
+                    frame = annotate_faces(frame, face_labels)
+
+                # Show progress
+                if frame_count % (30 * sample_rate) == 0:  # Update progress periodically
+                    logger.info(f"Processing frame {frame_count}/{total_frames} ({frame_count/total_frames*100:.1f}%)")
+
+                # Write frame
+                if out is not None:
+                    with metrics.time("encode"):
+                        out.write(frame)
+
+            if progress_callback is not None and chunk:
+                progress_callback(chunk[-1][0], total_frames)
+
+        if errors:
+            raise errors[0]
 
-            processed_frames += 1
+    except Exception as e:
+        logger.exception(f"Error processing video: {str(e)}")
+        raise
+    finally:
+        # Stop the worker stages before releasing the capture they read from
+        stop.set()
+        for worker in workers:
+            worker.join()
 
-            # Convert to RGB for prediction
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Release resources
+        cap.release()
+        if out is not None:
+            out.release()
+
+    summary = summarize_emotions(emotion_counts, processed_frames, total_frames, output_path)
+    if adaptive:
+        summary["adaptive_sampling"] = adaptive_sampling_stats(processed_frames, reused_frames)
+    if faces:
+        summary["faces"] = summarize_faces(face_stats)
+        summary["face_detection"] = tracker.stats()
+    if record_timeline:
+        summary["frame_timeline"] = frame_timeline
+
+    logger.info(f"Video processing complete. Dominant emotion: {summary['dominant_emotion']}")
+    if output_path:
+        logger.info(f"Processed video saved to {output_path}")
 
-            # Get prediction
-            emotion, probs = predict_face_emotion(frame_rgb)
+    return output_path, summary
 
-            # Update predictor with new prediction
-            predictor.update(emotion, probs)
+_video_pool = None
+_video_pool_lock = threading.Lock()
+
+def _init_video_worker(num_threads):
+    """Load a face model into a process_video_parallel worker, sized to its share of the CPUs"""
+    global TFLITE_NUM_THREADS
+    TFLITE_NUM_THREADS = num_threads
+    cv2.setNumThreads(num_threads)
+    if INFERENCE_BACKEND == "keras":
+        try:
+            import tensorflow as tf
+            tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        except ImportError:
+            pass  # Reported by load_models below
+
+    model_status["audio"]["enabled"] = False
+    load_models()
+    warmup_models()
+
+def get_video_pool():
+    """
+    Process pool for process_video_parallel, created on first use.
+    Workers are spawned rather than forked, since TensorFlow doesn't survive a
+    fork, and each keeps its own face model for the lifetime of the pool.
+    """
+    global _video_pool
+    with _video_pool_lock:
+        if _video_pool is None:
+            num_threads = max(1, (os.cpu_count() or 1) // VIDEO_PARALLEL_WORKERS)
+            _video_pool = ProcessPoolExecutor(max_workers=VIDEO_PARALLEL_WORKERS,
+                                              mp_context=multiprocessing.get_context("spawn"),
+                                              initializer=_init_video_worker,
+                                              initargs=(num_threads,))
+    return _video_pool
+
+def _process_video_chunk(video_path, segment_path, frame_range, options):
+    """Worker entry point: process one frame range and return its summary and stage metrics"""
+    if face_model is None:
+        raise RuntimeError(f"The face model is not available in the worker: {model_status['face']['error']}")
+
+    metrics = JobMetrics()
+    _, summary = process_video(video_path, output_path=segment_path, frame_range=frame_range,
+                               metrics=metrics, **options)
+    summary["metrics"] = metrics.snapshot()
+    return summary
+
+def concat_video_segments(segment_paths, output_path):
+    """Join video segments with identical encoding into one file without re-encoding"""
+    list_path = output_path + ".segments.txt"
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+    try:
+        result = subprocess.run(
+            [FFMPEG_BINARY, "-v", "error", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+             "-c", "copy", output_path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Could not join video segments: {result.stderr.decode(errors='replace').strip()}")
+    finally:
+        os.remove(list_path)
 
-            # Get smooth prediction
-            smooth_emotion, smooth_probs = predictor.get_smooth_prediction()
+def parallel_chunk_count(total_frames):
+    """Number of frame ranges process_video_parallel splits a video of total_frames into"""
+    return min(VIDEO_PARALLEL_WORKERS, total_frames // max(1, VIDEO_PARALLEL_MIN_CHUNK))
 
-            if smooth_emotion is not None:
-                # Update emotion counts for summary
-                emotion_counts[smooth_emotion] += 1
+def process_video_parallel(video_path, output_path=None, sample_rate=1, batch_size=FACE_BATCH_SIZE,
+                           progress_callback=None, summary_only=False, record_timeline=False, metrics=None,
+                           adaptive=False, faces=False):
+    """
+    process_video split over frame ranges processed concurrently by worker processes
+    Each range also classifies the sampled frames just before it (see frame_range in
+    process_video), so chunk boundaries don't reset the temporal smoothing. The
+    annotated segments are joined with ffmpeg. Face ids are numbered per chunk, so a face
+    that crosses a chunk boundary is listed once per chunk. Videos too short to fill two chunks of
+    VIDEO_PARALLEL_MIN_CHUNK frames are processed in this process instead.
+    Returns:
+        Same as process_video; progress_callback is called as each chunk finishes
+    """
+    if not os.path.exists(video_path):
+        logger.error(f"Error: Video not found at {video_path}")
+        raise FileNotFoundError(f"Video not found at {video_path}")
 
-                # Prepare probability text with smoothed predictions
-                prob_text = f"Probabilities:"
-                emotion_labels = ['aggressive', 'lazy_nervous', 'normal', 'tired_sleepy']
-                for label, prob in zip(emotion_labels, smooth_probs):
-                    prob_text += f"\n{label}: {prob:.2f}"
+    metrics = metrics if metrics is not None else JobMetrics()
+    options = {"sample_rate": sample_rate, "batch_size": batch_size, "summary_only": summary_only,
+               "record_timeline": record_timeline, "adaptive": adaptive, "faces": faces}
 
-                # Add text to frame
-                frame = cv2.putText(frame, f"Emotion: {smooth_emotion}", (10, 30),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
 
-                y = 70
-                for line in prob_text.split('\n'):
-                    frame = cv2.putText(frame, line, (10, y),
-                                      cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                    y += 30
+    num_chunks = parallel_chunk_count(total_frames)
+    if num_chunks < 2:
+        return process_video(video_path, output_path=output_path, progress_callback=progress_callback,
+                             metrics=metrics, **options)
 
-            # Show progress
-            if frame_count % (30 * sample_rate) == 0:  # Update progress periodically
-                logger.info(f"Processing frame {frame_count}/{total_frames} ({frame_count/total_frames*100:.1f}%)")
+    # The last range runs to the end of the stream in case CAP_PROP_FRAME_COUNT is off
+    bounds = [total_frames * i // num_chunks for i in range(num_chunks)] + [None]
+    ranges = list(zip(bounds[:-1], bounds[1:]))
 
-            # Write frame
-            out.write(frame)
+    if summary_only:
+        output_path = None
+        segment_paths = [None] * num_chunks
+    else:
+        output_path = output_path or default_output_path()
+        base, extension = os.path.splitext(output_path)
+        segment_paths = [f"{base}.part{i}{extension}" for i in range(num_chunks)]
 
-    except Exception as e:
-        logger.exception(f"Error processing video: {str(e)}")
-        raise
+    logger.info(f"Processing {video_path} as {num_chunks} parallel chunks")
+    pool = get_video_pool()
+    summaries = [None] * num_chunks
+    try:
+        with metrics.time("parallel_chunks"):
+            futures = {pool.submit(_process_video_chunk, video_path, segment_path, frame_range, options): i
+                       for i, (segment_path, frame_range) in enumerate(zip(segment_paths, ranges))}
+            done_frames = 0
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    summaries[i] = future.result()
+                    start, end = ranges[i]
+                    done_frames += (end if end is not None else total_frames) - start
+                    if progress_callback is not None:
+                        progress_callback(min(done_frames, total_frames), total_frames)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        if output_path:
+            with metrics.time("concat"):
+                concat_video_segments(segment_paths, output_path)
     finally:
-        # Release resources
-        cap.release()
-        out.release()
+        for path in segment_paths:
+            if path and os.path.exists(path):
+                os.remove(path)
 
-    # Calculate dominant emotion
-    dominant_emotion = max(emotion_counts.items(), key=lambda x: x[1])[0] if processed_frames > 0 else "unknown"
+    emotion_counts = {label: 0 for label in EMOTION_LABELS}
+    processed_frames = 0
+    reused_frames = 0
+    frame_timeline = []
+    face_summaries = []
+    face_detection = {"frames": 0, "detections": 0, "next_id": 0}
+    for chunk_summary in summaries:
+        metrics.merge(chunk_summary["metrics"])
+        processed_frames += chunk_summary["processed_frames"]
+        if adaptive:
+            reused_frames += chunk_summary["adaptive_sampling"]["reused_frames"]
+        if faces:
+            # Continue the face ids where the previous chunk stopped
+            for face in chunk_summary["faces"]:
+                face_summaries.append(dict(face, face_id=face["face_id"] + face_detection["next_id"]))
+            for key, value in chunk_summary["face_detection"].items():
+                face_detection[key] += value
+        for emotion, count in chunk_summary["emotion_counts"].items():
+            emotion_counts[emotion] += count
+        frame_timeline.extend(chunk_summary.get("frame_timeline", []))
+
+    summary = summarize_emotions(emotion_counts, processed_frames, total_frames, output_path)
+    summary["parallel_chunks"] = num_chunks
+    if adaptive:
+        summary["adaptive_sampling"] = adaptive_sampling_stats(processed_frames, reused_frames)
+    if faces:
+        summary["faces"] = face_summaries
+        summary["face_detection"] = face_detection
+    if record_timeline:
+        summary["frame_timeline"] = frame_timeline
+
+    logger.info(f"Parallel video processing complete. Dominant emotion: {summary['dominant_emotion']}")
+    return output_path, summary
 
-    # Calculate percentages
-    emotion_percentages = {}
-    for emotion, count in emotion_counts.items():
-        if processed_frames > 0:
-            emotion_percentages[emotion] = (count / processed_frames) * 100
-        else:
-            emotion_percentages[emotion] = 0
+# Audio model vocabulary (after EMOTION_MAPPING) -> face model labels, used to fuse the
+# two modalities. Audio emotions without a face equivalent don't contribute to fusion.
+AUDIO_TO_FACE_EMOTION = {
+    "aggressive": "aggressive",
+    "nervous": "lazy_nervous",
+    "lazy": "lazy_nervous",
+    "natural": "normal"
+}
+
+def extract_audio_track(video_path):
+    """Demux the audio track of a video to mono WAV bytes at librosa's default rate"""
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-v", "error", "-i", video_path, "-vn", "-ac", "1", "-ar", "22050", "-f", "wav", "pipe:1"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
+    )
+    if result.returncode != 0 or len(result.stdout) <= 44:  # 44 bytes = WAV header only
+        raise ValueError(f"No audio track could be extracted: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+def fuse_emotions(frame_timeline, audio_timeline, face_weight=FUSION_FACE_WEIGHT):
+    """
+    Combine face and audio predictions over the audio segments
+    Each segment's face score is the distribution of smoothed face emotions of the
+    frames inside it; the audio score puts the segment's confidence on its emotion.
+    Returns:
+        Per-segment fused emotions and the overall fused emotion
+    """
+    face_index = {label: i for i, label in enumerate(EMOTION_LABELS)}
+    times = np.array([t for _, t, _ in frame_timeline])
+    labels = np.array([face_index[emotion] for _, _, emotion in frame_timeline], dtype=int)
+
+    segments = []
+    total = np.zeros(len(EMOTION_LABELS))
+    for window in audio_timeline:
+        face_scores = np.zeros(len(EMOTION_LABELS))
+        in_window = labels[(times >= window["start"]) & (times < window["end"])]
+        if len(in_window):
+            face_scores = np.bincount(in_window, minlength=len(EMOTION_LABELS)) / len(in_window)
+
+        audio_scores = np.zeros(len(EMOTION_LABELS))
+        audio_label = AUDIO_TO_FACE_EMOTION.get(window["emotion"])
+        if audio_label is not None:
+            audio_scores[face_index[audio_label]] = window["confidence"]
+
+        # Fall back to whichever modality has evidence for this segment
+        face_share = face_weight if len(in_window) and audio_label is not None else float(len(in_window) > 0)
+        fused = face_share * face_scores + (1 - face_share) * audio_scores
+        total += fused
+
+        segments.append({
+            "start": window["start"],
+            "end": window["end"],
+            "face_frames": int(len(in_window)),
+            "audio_emotion": window["emotion"],
+            "fused_emotion": EMOTION_LABELS[int(np.argmax(fused))] if fused.any() else "unknown",
+            "fused_scores": {label: float(score) for label, score in zip(EMOTION_LABELS, fused)}
+        })
 
-    # Create summary
-    summary = {
-        "processed_frames": processed_frames,
-        "total_frames": total_frames,
-        "dominant_emotion": dominant_emotion,
-        "emotion_distribution": emotion_percentages,
-        "processed_video_path": output_path
+    if segments:
+        overall = total / len(segments)
+    elif len(labels):
+        # No audio: the overall result is the face distribution
+        overall = np.bincount(labels, minlength=len(EMOTION_LABELS)) / len(labels)
+    else:
+        overall = total
+    return {
+        "segments": segments,
+        "overall_emotion": EMOTION_LABELS[int(np.argmax(overall))] if overall.any() else "unknown",
+        "overall_scores": {label: float(score) for label, score in zip(EMOTION_LABELS, overall)},
+        "face_weight": face_weight
     }
 
-    logger.info(f"Video processing complete. Dominant emotion: {dominant_emotion}")
-    logger.info(f"Processed video saved to {output_path}")
-
-    return output_path, summary
+def analyze_video_with_audio(video_path, output_path=None, parallel=False, **video_options):
+    """
+    Run the face pipeline and the audio model on the same clip concurrently and fuse them
+    The audio track is cut into non-overlapping AUDIO_TIMELINE_WINDOW segments.
+    If the clip has no usable audio the result falls back to the face analysis.
+    With parallel=True the face pipeline is process_video_parallel.
+    Returns:
+        Path to the processed video and the face summary extended with "audio" and "multimodal"
+    """
+    metrics = video_options.get("metrics") or JobMetrics()
+
+    def analyze_audio():
+        with metrics.time("audio_analysis"):
+            wav = extract_audio_track(video_path)
+            return predict_audio_timeline(io.BytesIO(wav), hop=AUDIO_TIMELINE_WINDOW)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        audio_future = executor.submit(analyze_audio)
+        video_fn = process_video_parallel if parallel else process_video
+        processed_path, summary = video_fn(video_path, output_path=output_path,
+                                           record_timeline=True, **video_options)
+        try:
+            audio_timeline, audio_summary = audio_future.result()
+        except Exception as e:
+            logger.warning(f"Audio analysis of {video_path} failed: {str(e)}")
+            audio_timeline, audio_summary = [], {"error": str(e)}
+
+    frame_timeline = summary.pop("frame_timeline")
+    summary["audio"] = {"timeline": audio_timeline, "summary": audio_summary}
+    summary["multimodal"] = fuse_emotions(frame_timeline, audio_timeline)
+
+    return processed_path, summary
 
 # Endpoints for Audio Emotion Recognition
 @app.route("/predict-audio", methods=["POST"])
@@ -252,51 +1280,125 @@ def predict_audio_emotion():
     Usage with curl:
       curl -X POST -F audio_file=@test.wav http://localhost:5000/predict-audio
     """
+    unavailable = model_unavailable("audio")
+    if unavailable:
+        return unavailable
+
     if "audio_file" not in request.files:
         return jsonify({"error": "No audio_file in request"}), 400
 
     audio_file = request.files["audio_file"]
 
-    # Save the file temporarily
-    filepath = "temp_audio.wav"
-    audio_file.save(filepath)
+    try:
+        # Decode straight from the uploaded bytes, or reuse the result for a repeated upload
+        result = predict_audio_sources([read_upload(audio_file)])[0]
+        if "error" in result:
+            return jsonify(result), 500
+
+        # Return JSON response
+        return jsonify({
+            "emotion": result["emotion"],
+            "confidence": result["confidence"]
+        })
+
+    except Exception as e:
+        logger.exception("Error during audio prediction")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/predict-audio-batch", methods=["POST"])
+def predict_audio_batch():
+    """
+    Endpoint to predict emotions for many uploaded WAV files at once.
+    Features are extracted in parallel in a process pool and all files are
+    classified with a single model pass.
+    Usage with curl:
+      curl -X POST -F audio_files=@a.wav -F audio_files=@b.wav http://localhost:5000/predict-audio-batch
+    """
+    unavailable = model_unavailable("audio")
+    if unavailable:
+        return unavailable
+
+    audio_files = request.files.getlist("audio_files")
+    if not audio_files:
+        return jsonify({"error": "No audio_files in request"}), 400
+
+    if len(audio_files) > AUDIO_BATCH_MAX_FILES:
+        return jsonify({"error": f"At most {AUDIO_BATCH_MAX_FILES} audio_files per request"}), 400
 
     try:
-        # Extract features
-        features = extract_features_from_audio(filepath)
+        results = predict_audio_sources([read_upload(audio_file) for audio_file in audio_files])
 
-        # Scale the features
-        features_scaled = scaler.transform([features])  # shape: (1, 32)
+        return jsonify({
+            "count": len(results),
+            "results": [{"filename": audio_file.filename, **result}
+                        for audio_file, result in zip(audio_files, results)]
+        })
 
-        # Reshape for CNN-LSTM => (1, 32, 1)
-        features_scaled = np.reshape(features_scaled, (features_scaled.shape[0], features_scaled.shape[1], 1))
+    except Exception as e:
+        logger.exception("Error during batch audio prediction")
+        return jsonify({"error": str(e)}), 500
 
-        # Predict
-        predictions = audio_model.predict(features_scaled)
-        predicted_index = np.argmax(predictions, axis=1)[0]
-        predicted_emotion = label_encoder.inverse_transform([predicted_index])[0]
+def predict_audio_timeline(source, hop=AUDIO_TIMELINE_HOP, window=AUDIO_TIMELINE_WINDOW):
+    """
+    Classify every sliding window of a recording with one batched audio_model pass
+    Window length and hop are rounded to whole feature frames; the summary reports
+    the values used, and "end" follows from them.
+    Returns:
+        List of per-window predictions and an aggregate over all windows
+    """
+    features, start_times, window_seconds, hop_seconds = extract_window_features(source, window=window, hop=hop)
+    predictions = predict_scaled_audio(scale_audio_features(features))
 
-        EMOTION_MAPPING = {
-            "fear": "nervous",
-            "angry": "aggressive",
-            "bored": "lazy",
-            "neutral": "natural"
-        }
+    timeline = [{"start": float(start), "end": float(start + window_seconds), "emotion": emotion, "confidence": confidence}
+                for start, (emotion, confidence) in zip(start_times, predictions)]
+
+    emotion_counts = {}
+    for item in timeline:
+        emotion_counts[item["emotion"]] = emotion_counts.get(item["emotion"], 0) + 1
 
-        mapped_emotion = EMOTION_MAPPING.get(predicted_emotion, predicted_emotion)
+    summary = {
+        "windows": len(timeline),
+        "window_seconds": window_seconds,
+        "hop_seconds": hop_seconds,
+        "dominant_emotion": max(emotion_counts.items(), key=lambda x: x[1])[0] if timeline else "unknown",
+        "emotion_distribution": {emotion: count / len(timeline) * 100 for emotion, count in emotion_counts.items()},
+        "mean_confidence": float(np.mean([item["confidence"] for item in timeline])) if timeline else 0.0
+    }
 
-        # Cleanup temp file
-        if os.path.exists(filepath):
-            os.remove(filepath)
+    return timeline, summary
+
+@app.route("/predict-audio-timeline", methods=["POST"])
+def predict_audio_timeline_endpoint():
+    """
+    Endpoint to predict an emotion timeline over a whole recording.
+    The recording is split into AUDIO_TIMELINE_WINDOW second windows every `hop` seconds.
+    Usage with curl:
+      curl -X POST -F audio_file=@long.wav -F hop=1.0 http://localhost:5000/predict-audio-timeline
+    """
+    unavailable = model_unavailable("audio")
+    if unavailable:
+        return unavailable
+
+    if "audio_file" not in request.files:
+        return jsonify({"error": "No audio_file in request"}), 400
+
+    audio_file = request.files["audio_file"]
+    hop = float(request.form.get("hop", AUDIO_TIMELINE_HOP))
+    if hop <= 0:
+        return jsonify({"error": "hop must be positive"}), 400
+
+    try:
+        timeline, summary = predict_audio_timeline(io.BytesIO(read_upload(audio_file)), hop=hop)
 
-        # Return JSON response
         return jsonify({
-            "emotion": mapped_emotion,
-            "confidence": float(np.max(predictions))
+            "window_seconds": summary["window_seconds"],
+            "hop_seconds": summary["hop_seconds"],
+            "timeline": timeline,
+            "summary": summary
         })
 
     except Exception as e:
-        logger.exception("Error during audio prediction")
+        logger.exception("Error during audio timeline prediction")
         return jsonify({"error": str(e)}), 500
 
 # Endpoints for Facial Emotion Recognition
@@ -307,6 +1409,10 @@ def predict_face_emotion_endpoint():
     Usage with curl:
       curl -X POST -F image_file=@face.jpg http://localhost:5000/predict-face
     """
+    unavailable = model_unavailable("face")
+    if unavailable:
+        return unavailable
+
     if "image_file" not in request.files:
         return jsonify({"error": "No image_file in request"}), 400
 
@@ -316,19 +1422,19 @@ def predict_face_emotion_endpoint():
         return jsonify({"error": "Empty filename"}), 400
 
     try:
-        # Save the file temporarily
-        filepath = "temp_face.jpg"
-        image_file.save(filepath)
-
-        # Read the image with OpenCV
-        img = cv2.imread(filepath)
+        # Decode the image with OpenCV straight from the uploaded bytes
+        img = cv2.imdecode(np.frombuffer(read_upload(image_file), dtype=np.uint8), cv2.IMREAD_COLOR)
         if img is None:
             return jsonify({"error": "Failed to read image"}), 400
 
         img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-        # Get prediction
-        emotion, probs = predict_face_emotion(img_rgb)
+        # Get prediction, sharing a forward pass with concurrent requests when batching is enabled
+        if face_batcher is not None:
+            probs = face_batcher.predict(preprocess_batch([img_rgb])[0])
+            emotion = EMOTION_LABELS[int(np.argmax(probs))]
+        else:
+            emotion, probs = predict_face_emotion(img_rgb)
 
         # Convert probabilities to standard Python float for JSON serialization
         probabilities = {
@@ -338,10 +1444,6 @@ def predict_face_emotion_endpoint():
             'tired_sleepy': float(probs[3])
         }
 
-        # Cleanup temp file
-        if os.path.exists(filepath):
-            os.remove(filepath)
-
         # Return JSON response
         return jsonify({
             "emotion": emotion,
@@ -353,6 +1455,224 @@ def predict_face_emotion_endpoint():
         logger.exception("Error during facial prediction")
         return jsonify({"error": str(e)}), 500
 
+def parse_video_options(form):
+    """Read the process_video keyword arguments from a /process-video form"""
+    return {
+        "sample_rate": int(form.get("sample_rate", 1)),
+        "batch_size": int(form.get("batch_size", FACE_BATCH_SIZE)),
+        "summary_only": form.get("summary_only", "false").lower() == "true",
+        "with_audio": form.get("with_audio", "false").lower() == "true",
+        "parallel": form.get("parallel", "false").lower() == "true",
+        "adaptive": form.get("adaptive", "false").lower() == "true",
+        "faces": form.get("faces", "false").lower() == "true",
+        "time_budget": float(form["time_budget"]) if form.get("time_budget") else None,
+        "target_frames": int(form["target_frames"]) if form.get("target_frames") else None
+    }
+
+def read_upload(file_storage):
+    """Read an uploaded file into memory, counting the bytes received"""
+    data = file_storage.read()
+    counters["bytes_uploaded"].inc(len(data))
+    return data
+
+def save_video_upload(video_file, metrics=None):
+    """
+    Save an uploaded video and check that OpenCV can open it
+    Returns:
+        job_id, path of the saved upload, path for the processed video, and the frame
+        count, which is None if the file could not be opened (the upload is removed)
+    """
+    # Create a unique identifier for this job; it is also the polling key and names the upload,
+    # so it must not repeat for the same filename within a second
+    job_id = datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + uuid.uuid4().hex
+    extension = os.path.splitext(video_file.filename)[1]
+    temp_video_path = f"temp_video_{job_id}{extension}"
+    output_path = os.path.join(OUTPUT_DIR, f"processed_{job_id}{extension}")
+
+    logger.info(f"Starting video processing job #{job_id} for file {video_file.filename}")
+
+    # Save the file temporarily
+    metrics = metrics if metrics is not None else JobMetrics()
+    with metrics.time("upload_save"):
+        video_file.save(temp_video_path)
+    metrics.count("bytes_uploaded", os.path.getsize(temp_video_path))
+
+    # First check if the video file is valid
+    cap = cv2.VideoCapture(temp_video_path)
+    if not cap.isOpened():
+        cap.release()
+        if os.path.exists(temp_video_path):
+            os.remove(temp_video_path)
+        return job_id, temp_video_path, output_path, None
+
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    duration = total_frames / fps if fps > 0 else 0
+    cap.release()
+
+    logger.info(f"Video info: {total_frames} frames, {fps:.2f} FPS, ~{duration:.1f} seconds")
+
+    return job_id, temp_video_path, output_path, total_frames
+
+def measure_frame_costs(video_path, summary_only=False):
+    """
+    Time the first VIDEO_BUDGET_PROBE_FRAMES frames of a video through the per-frame work of process_video
+    Returns:
+        Seconds per decoded frame, per sampled frame (conversion, resize and face_model)
+        and per written frame (0 with summary_only)
+    """
+    cap = cv2.VideoCapture(video_path)
+    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    frames = []
+    start = time.perf_counter()
+    while len(frames) < VIDEO_BUDGET_PROBE_FRAMES:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    decode_seconds = (time.perf_counter() - start) / max(1, len(frames))
+    cap.release()
+
+    if not frames:
+        return decode_seconds, face_frame_seconds or 0.0, 0.0
+
+    start = time.perf_counter()
+    batch = preprocess_batch([cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames])
+    sample_seconds = (time.perf_counter() - start) / len(frames)
+    if face_frame_seconds is not None:
+        sample_seconds += face_frame_seconds
+    else:
+        # Warmup hasn't run yet, time the model on the probe frames instead
+        start = time.perf_counter()
+        face_model.predict(batch)
+        sample_seconds += (time.perf_counter() - start) / len(frames)
+
+    write_seconds = 0.0
+    if not summary_only:
+        probe_path = os.path.join(OUTPUT_DIR, f"probe_{os.getpid()}_{threading.get_ident()}.mp4")
+        height, width = frames[0].shape[:2]
+        out = cv2.VideoWriter(probe_path, cv2.VideoWriter_fourcc(*'mp4v'), max(1, fps), (width, height))
+        probs = np.full(len(EMOTION_LABELS), 1.0 / len(EMOTION_LABELS))
+        start = time.perf_counter()
+        for frame in frames:
+            out.write(annotate_frame(frame, EMOTION_LABELS[0], probs))
+        out.release()
+        write_seconds = (time.perf_counter() - start) / len(frames)
+        os.remove(probe_path)
+
+    return decode_seconds, sample_seconds, write_seconds
+
+def plan_sampling(video_path, total_frames, time_budget=None, target_frames=None, sample_rate=1,
+                  summary_only=False, parallel=False):
+    """
+    Pick the sample_rate for a processing-time budget (seconds) and/or a number of analyzed frames
+    The time estimate is the decode and write cost of every frame plus the sampled-frame
+    cost from measure_frame_costs, added up even though the pipeline stages overlap, so it
+    errs on the slow side. face_model's input is fixed at IMG_SIZE, so the stride is the
+    only knob; sample_rate is never lowered below the one requested.
+    Returns:
+        dict with the chosen sample_rate, the requested budget and the estimate behind it
+    """
+    plan = {"requested_seconds": time_budget, "requested_frames": target_frames}
+    if target_frames:
+        sample_rate = max(sample_rate, total_frames // target_frames)
+
+    if time_budget:
+        decode_seconds, sample_seconds, write_seconds = measure_frame_costs(video_path, summary_only)
+        workers = max(1, parallel_chunk_count(total_frames)) if parallel else 1
+        fixed_seconds = total_frames * (decode_seconds + write_seconds) / workers
+        available = time_budget * VIDEO_BUDGET_SAFETY - fixed_seconds
+        if available > 0:
+            sample_rate = max(sample_rate, int(np.ceil(total_frames * sample_seconds / workers / available)))
+        else:
+            # Decoding alone doesn't fit, analyze as few frames as possible
+            sample_rate = max(sample_rate, total_frames)
+
+    sample_rate = max(1, min(sample_rate, max(1, total_frames)))
+    plan["sample_rate"] = sample_rate
+    if time_budget:
+        plan.update({
+            "feasible": available > 0,
+            "estimated_seconds": fixed_seconds + (total_frames // sample_rate) * sample_seconds / workers,
+            "per_frame_ms": {"decode": decode_seconds * 1000.0,
+                             "sample": sample_seconds * 1000.0,
+                             "write": write_seconds * 1000.0}
+        })
+    return plan
+
+def run_video_job(job_id, temp_video_path, output_path, total_frames, options, progress_callback=None,
+                  metrics=None):
+    """
+    Run process_video for a saved upload and remove the upload afterwards
+    Returns:
+        Path to the processed video, summary with processing_metadata, processing time in seconds
+    """
+    try:
+        start_time = datetime.now()
+        metrics = metrics if metrics is not None else JobMetrics()
+        video_options = dict(options, metrics=metrics)
+        time_budget = video_options.pop("time_budget", None)
+        target_frames = video_options.pop("target_frames", None)
+
+        plan = None
+        if time_budget or target_frames:
+            with metrics.time("plan_sampling"):
+                plan = plan_sampling(temp_video_path, total_frames, time_budget, target_frames,
+                                     sample_rate=options["sample_rate"], summary_only=options["summary_only"],
+                                     parallel=options.get("parallel", False))
+            video_options["sample_rate"] = plan["sample_rate"]
+        elif total_frames > 1000 and options["sample_rate"] == 1:
+            # If video is very large, suggest using a higher sample rate
+            logger.warning(f"Large video with {total_frames} frames. Consider using sample_rate > 1 "
+                           f"or a time_budget for faster processing.")
+
+        sample_rate = video_options["sample_rate"]
+        logger.info(f"Processing video for job #{job_id} with sample rate {sample_rate}")
+
+        if video_options.pop("with_audio", False):
+            processed_path, summary = analyze_video_with_audio(
+                temp_video_path,
+                output_path=output_path,
+                progress_callback=progress_callback,
+                **video_options
+            )
+        else:
+            video_fn = process_video_parallel if video_options.pop("parallel", False) else process_video
+            processed_path, summary = video_fn(
+                temp_video_path,
+                output_path=output_path,
+                progress_callback=progress_callback,
+                **video_options
+            )
+
+        # Calculate processing time
+        end_time = datetime.now()
+        processing_time = (end_time - start_time).total_seconds()
+
+        logger.info(f"Video processing completed in {processing_time:.2f} seconds")
+    finally:
+        # Clean up temporary file
+        if os.path.exists(temp_video_path):
+            os.remove(temp_video_path)
+
+    # Add processing metadata to summary
+    summary["processing_metadata"] = {
+        "processing_time_seconds": processing_time,
+        "job_id": job_id,
+        **options,
+        "sample_rate": sample_rate,
+        **metrics.snapshot()
+    }
+    if plan is not None:
+        plan["achieved_seconds"] = processing_time
+        plan["achieved_frames"] = summary["processed_frames"]
+        if time_budget:
+            plan["within_budget"] = processing_time <= time_budget
+        summary["processing_metadata"]["budget"] = plan
+    metrics.count("video_jobs")
+
+    return processed_path, summary, processing_time
+
 @app.route("/process-video", methods=["POST"])
 def process_video_endpoint():
     """
@@ -362,7 +1682,15 @@ def process_video_endpoint():
     Parameters:
     - video_file: The video file to process
     - sample_rate: (optional) Process 1 frame every N frames for efficiency (default=1)
-    - return_video: (optional) Whether to return the processed video (default=False)
+    - batch_size: (optional) Number of sampled frames classified per forward pass (default=FACE_BATCH_SIZE)
+    - summary_only: (optional) Only return the analysis JSON, without writing a processed video (default=False)
+    - with_audio: (optional) Also classify the clip's audio track and fuse it with the face results (default=False)
+    - adaptive: (optional) Skip inference on sampled frames where the scene hasn't changed (default=False)
+    - faces: (optional) Classify detected face crops instead of whole frames and report each face (default=False)
+    - time_budget: (optional) Processing-time budget in seconds; the sample_rate is chosen to fit it
+    - target_frames: (optional) Number of frames to analyze; the sample_rate is chosen to give about that many
+    - parallel: (optional) Split long videos into frame ranges processed by VIDEO_PARALLEL_WORKERS processes (default=False)
+    - return_video: (optional) Whether to return the processed video (default=False, ignored with summary_only)
 
     Usage with curl:
       curl -X POST -F "video_file=@test.mp4" -F "sample_rate=5" http://localhost:5000/process-video
@@ -371,6 +1699,10 @@ def process_video_endpoint():
     - JSON with emotion analysis and path to processed video
     - If return_video=true, returns the processed video file
     """
+    unavailable = model_unavailable("face")
+    if unavailable:
+        return unavailable
+
     if "video_file" not in request.files:
         return jsonify({"error": "No video_file in request"}), 400
 
@@ -380,68 +1712,22 @@ def process_video_endpoint():
         return jsonify({"error": "Empty filename"}), 400
 
     # Get processing parameters
-    sample_rate = int(request.form.get("sample_rate", 1))
+    options = parse_video_options(request.form)
     return_video = request.form.get("return_video", "false").lower() == "true"
 
-    # Create a unique identifier for this job
-    job_id = datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + str(hash(video_file.filename) % 10000)
-    temp_video_path = f"temp_video_{job_id}{os.path.splitext(video_file.filename)[1]}"
-    output_path = os.path.join(OUTPUT_DIR, f"processed_{job_id}{os.path.splitext(video_file.filename)[1]}")
-
-    logger.info(f"Starting video processing job #{job_id} for file {video_file.filename}")
-
+    job_id = None
+    metrics = JobMetrics()
     try:
-        # Save the file temporarily
-        video_file.save(temp_video_path)
-
-        # First check if the video file is valid
-        cap = cv2.VideoCapture(temp_video_path)
-        if not cap.isOpened():
-            cap.release()
-            if os.path.exists(temp_video_path):
-                os.remove(temp_video_path)
+        job_id, temp_video_path, output_path, total_frames = save_video_upload(video_file, metrics)
+        if total_frames is None:
             return jsonify({"error": "Could not open video file. The file may be corrupted or in an unsupported format."}), 400
 
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = int(cap.get(cv2.CAP_PROP_FPS))
-        duration = total_frames / fps if fps > 0 else 0
-        cap.release()
-
-        logger.info(f"Video info: {total_frames} frames, {fps} FPS, ~{duration:.1f} seconds")
-
-        # If video is very large, suggest using a higher sample rate
-        if total_frames > 1000 and sample_rate == 1:
-            logger.warning(f"Large video with {total_frames} frames. Consider using sample_rate > 1 for faster processing.")
-
         # Process the video - this will block until complete
-        logger.info(f"Processing video {video_file.filename} with sample rate {sample_rate}")
-        start_time = datetime.now()
-
-        processed_path, summary = process_video(
-            temp_video_path,
-            output_path=output_path,
-            sample_rate=sample_rate
-        )
-
-        # Calculate processing time
-        end_time = datetime.now()
-        processing_time = (end_time - start_time).total_seconds()
-
-        logger.info(f"Video processing completed in {processing_time:.2f} seconds")
-
-        # Clean up temporary file
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
-
-        # Add processing metadata to summary
-        summary["processing_metadata"] = {
-            "processing_time_seconds": processing_time,
-            "job_id": job_id,
-            "sample_rate": sample_rate
-        }
+        processed_path, summary, processing_time = run_video_job(job_id, temp_video_path, output_path,
+                                                                  total_frames, options, metrics=metrics)
 
         # Return the processed video if requested
-        if return_video and os.path.exists(processed_path):
+        if return_video and processed_path and os.path.exists(processed_path):
             logger.info(f"Returning processed video file: {processed_path}")
             return send_file(processed_path, as_attachment=True,
                             download_name=f"processed_{os.path.basename(video_file.filename)}")
@@ -450,7 +1736,7 @@ def process_video_endpoint():
         return jsonify({
             "status": "success",
             "filename": video_file.filename,
-            "processed_video": os.path.basename(processed_path),
+            "processed_video": os.path.basename(processed_path) if processed_path else None,
             "processing_time_seconds": processing_time,
             "job_id": job_id,
             "analysis": summary
@@ -458,28 +1744,260 @@ def process_video_endpoint():
 
     except Exception as e:
         logger.exception(f"Error during video processing for job #{job_id}")
-        # Clean up any temporary files
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
         return jsonify({
             "status": "error",
             "error": str(e),
             "job_id": job_id
         }), 500
 
-# Health check endpoint
+class VideoJobQueue:
+    """
+    Bounded queue of /process-video jobs served by a fixed pool of worker threads.
+    Keeps the state of recent jobs so clients can poll for progress and results.
+    """
+    def __init__(self, num_workers=1, max_queued=8, max_history=100):
+        self.num_workers = num_workers
+        self.max_history = max_history
+        self.pending = queue.Queue(maxsize=max_queued)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.workers = []
+
+    def submit(self, job_id, temp_video_path, output_path, total_frames, options, filename, metrics=None):
+        """
+        Queue a saved upload for processing. Returns False if the queue is full.
+        Raises:
+            ValueError if a job with this id already exists
+        """
+        job = {
+            "job_id": job_id,
+            "filename": filename,
+            "status": "queued",
+            "frames_done": 0,
+            "total_frames": total_frames,
+            "progress": 0.0,
+            "submitted_at": datetime.now().isoformat(),
+            "output_path": output_path,
+            "options": options,
+            "metrics": metrics,
+            "summary": None,
+            "error": None
+        }
+        with self.lock:
+            if job_id in self.jobs:
+                raise ValueError(f"Video job {job_id} already exists")
+            self._start_workers()
+            try:
+                self.pending.put_nowait((job, temp_video_path))
+            except queue.Full:
+                return False
+            self.jobs[job_id] = job
+            self._trim_history()
+        return True
+
+    def get(self, job_id):
+        """Return a snapshot of a job's state, or None if it is unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def stats(self):
+        with self.lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+        return {
+            "workers": self.num_workers,
+            "queued": self.pending.qsize(),
+            "processing": statuses.count("processing")
+        }
+
+    def _start_workers(self):
+        if self.workers:
+            return
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._work, name=f"video-job-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def _trim_history(self):
+        """Forget the oldest finished jobs once more than max_history are tracked"""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("completed", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_history)]:
+            del self.jobs[job_id]
+
+    def _work(self):
+        while True:
+            job, temp_video_path = self.pending.get()
+            job_id = job["job_id"]
+
+            def report_progress(frames_done, total_frames):
+                with self.lock:
+                    job["frames_done"] = frames_done
+                    job["total_frames"] = total_frames
+                    job["progress"] = min(frames_done / total_frames, 1.0) if total_frames > 0 else 0.0
+
+            with self.lock:
+                job["status"] = "processing"
+                job["started_at"] = datetime.now().isoformat()
+
+            try:
+                _, summary, _ = run_video_job(job_id, temp_video_path, job["output_path"],
+                                              job["total_frames"], job["options"],
+                                              progress_callback=report_progress,
+                                              metrics=job["metrics"])
+                with self.lock:
+                    job["summary"] = summary
+                    job["status"] = "completed"
+                    job["progress"] = 1.0
+            except Exception as e:
+                logger.exception(f"Error during video processing for job #{job_id}")
+                with self.lock:
+                    job["error"] = str(e)
+                    job["status"] = "failed"
+            finally:
+                with self.lock:
+                    job["finished_at"] = datetime.now().isoformat()
+                    self._trim_history()
+                self.pending.task_done()
+
+video_jobs = VideoJobQueue(num_workers=VIDEO_JOB_WORKERS,
+                           max_queued=VIDEO_JOB_QUEUE_SIZE,
+                           max_history=VIDEO_JOB_HISTORY)
+
+def video_job_status(job):
+    """Public view of a job record"""
+    status = {key: job[key] for key in ("job_id", "filename", "status", "frames_done",
+                                         "total_frames", "progress", "submitted_at")}
+    for key in ("started_at", "finished_at", "error"):
+        if job.get(key):
+            status[key] = job[key]
+    return status
+
+@app.route("/process-video/submit", methods=["POST"])
+def submit_video_job():
+    """
+    Endpoint to queue a video for background processing.
+    Accepts the same parameters as /process-video (except return_video) and
+    returns the job_id immediately; poll /process-video/status/<job_id> for progress.
+
+    Usage with curl:
+      curl -X POST -F "video_file=@test.mp4" -F "sample_rate=5" http://localhost:5000/process-video/submit
+    """
+    unavailable = model_unavailable("face")
+    if unavailable:
+        return unavailable
+
+    if "video_file" not in request.files:
+        return jsonify({"error": "No video_file in request"}), 400
+
+    video_file = request.files["video_file"]
+
+    if not video_file.filename:
+        return jsonify({"error": "Empty filename"}), 400
+
+    options = parse_video_options(request.form)
+    metrics = JobMetrics()
+
+    job_id, temp_video_path, output_path, total_frames = save_video_upload(video_file, metrics)
+    if total_frames is None:
+        return jsonify({"error": "Could not open video file. The file may be corrupted or in an unsupported format."}), 400
+
+    try:
+        queued = video_jobs.submit(job_id, temp_video_path, output_path, total_frames,
+                                   options, video_file.filename, metrics=metrics)
+    except ValueError as e:
+        # The upload path belongs to the existing job, so leave it in place
+        return jsonify({"error": str(e), "job_id": job_id}), 409
+    if not queued:
+        if os.path.exists(temp_video_path):
+            os.remove(temp_video_path)
+        return jsonify({"error": "Video processing queue is full, try again later", "job_id": job_id}), 503
+
+    return jsonify({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/process-video/status/{job_id}",
+        "result_url": f"/process-video/result/{job_id}"
+    }), 202
+
+@app.route("/process-video/status/<job_id>", methods=["GET"])
+def video_job_status_endpoint(job_id):
+    """Endpoint reporting the state and progress (frames_done/total_frames) of a queued video job"""
+    job = video_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job_id {job_id}"}), 404
+    return jsonify(video_job_status(job))
+
+@app.route("/process-video/result/<job_id>", methods=["GET"])
+def video_job_result_endpoint(job_id):
+    """
+    Endpoint returning the result of a finished video job.
+    Returns the summary JSON, or the processed video file when called with ?return_video=true.
+    Responds with 202 and the current status while the job is still running.
+    """
+    job = video_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job_id {job_id}"}), 404
+
+    if job["status"] == "failed":
+        return jsonify({"status": "error", "error": job["error"], "job_id": job_id}), 500
+
+    if job["status"] != "completed":
+        return jsonify(video_job_status(job)), 202
+
+    summary = job["summary"]
+    processed_path = summary["processed_video_path"]
+
+    if request.args.get("return_video", "false").lower() == "true":
+        if not processed_path or not os.path.exists(processed_path):
+            return jsonify({"error": "Processed video is not available", "job_id": job_id}), 404
+        return send_file(processed_path, as_attachment=True,
+                        download_name=f"processed_{os.path.basename(job['filename'])}")
+
+    return jsonify({
+        "status": "success",
+        "filename": job["filename"],
+        "processed_video": os.path.basename(processed_path) if processed_path else None,
+        "processing_time_seconds": summary["processing_metadata"]["processing_time_seconds"],
+        "job_id": job_id,
+        "analysis": summary
+    })
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Per-stage latency histograms and counters in the Prometheus text format"""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+# Health check endpoints
 @app.route("/health", methods=["GET"])
 def health_check():
-    """Simple health check endpoint"""
+    """Health check endpoint: liveness plus readiness, model timings and service counters"""
     return jsonify({
         "status": "healthy",
+        "ready": models_ready(),
         "models_loaded": {
             "audio_model": audio_model is not None,
             "face_model": face_model is not None
-        }
+        },
+        "models": model_status,
+        "inference_backend": INFERENCE_BACKEND,
+        "audio_cache": audio_cache.stats(),
+        "face_microbatching": face_batcher.stats() if face_batcher is not None else None,
+        "video_jobs": video_jobs.stats()
     })
 
+@app.route("/health/live", methods=["GET"])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP"""
+    return jsonify({"status": "alive"})
+
+@app.route("/health/ready", methods=["GET"])
+def readiness_check():
+    """Readiness probe: 200 once every enabled model is loaded and warmed up, 503 before that"""
+    ready = models_ready()
+    return jsonify({"ready": ready, "models": model_status}), 200 if ready else 503
+
 if __name__ == '__main__':
     host = os.getenv('FLASK_HOST', '127.0.0.1')
     port = int(os.getenv('FLASK_PORT', 8000))
-    app.run(host=host, port=port, debug=True)
\ No newline at end of file
+    # Uploads are decoded in memory, so requests can be served concurrently
+    app.run(host=host, port=port, debug=True, threaded=True)
\ No newline at end of file
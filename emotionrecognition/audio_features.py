@@ -0,0 +1,162 @@
+import io
+import os
+import numpy as np
+
+# Feature extraction for the audio emotion model. Kept free of TensorFlow so it
+# can run in lightweight worker processes. librosa is imported on first use so
+# that importing this module (e.g. in a face-only deployment) stays cheap.
+
+# "fast" shares one framing/STFT between ZCR, RMS and MFCC (see frame_features);
+# "reference" is the original three-pass librosa extraction
+FEATURE_EXTRACTOR = os.getenv('AUDIO_FEATURE_EXTRACTOR', 'fast')
+
+# Resampler used when decoding, passed to librosa.load as res_type.
+# soxr_hq is librosa's default; soxr_lq or polyphase trade accuracy for speed.
+RESAMPLE_TYPE = os.getenv('AUDIO_RESAMPLE_TYPE', 'soxr_hq')
+
+N_FFT = 2048
+HOP_LENGTH = 512
+ZC_THRESHOLD = 1e-10
+TOP_DB = 80.0  # librosa.power_to_db's default floor below the loudest value
+
+# Windows clipped and averaged together by extract_window_features, bounding the
+# (n_mels, windows, frames) array of clipped log-mel values
+WINDOW_BLOCK = 256
+
+def extract_features_from_audio(filepath, n_mfcc=30):
+    """Extract audio features for emotion prediction from a path or a file-like object"""
+    import librosa
+
+    data, sr = librosa.load(filepath, duration=2.5, offset=0.6)
+    zcr = np.mean(librosa.feature.zero_crossing_rate(y=data))
+    rmse = np.mean(librosa.feature.rms(y=data))
+    mfccs = np.mean(librosa.feature.mfcc(y=data, sr=sr, n_mfcc=n_mfcc).T, axis=0)
+    features = np.hstack((zcr, rmse, mfccs))
+    return features
+
+def frame_features(data, sr, n_mfcc=30):
+    """
+    Framewise ZCR, RMS and MFCCs from a single framing of the signal
+    Matches librosa.feature.zero_crossing_rate / rms / mfcc with their default
+    2048-sample frames and 512-sample hop, but the centred frames are built once
+    and shared by RMS and the STFT, and ZCR is counted with a cumulative sum over
+    the sign changes of the signal instead of per frame.
+    Returns:
+        (2 + n_mfcc, n_frames) matrix with rows ZCR, RMS, MFCC 1..n_mfcc
+    """
+    zcr, rmse, mel_db = frame_signals(data, sr)
+    # Like power_to_db's top_db, the floor is set by the loudest value of the whole clip
+    mel_db = np.maximum(mel_db, mel_db.max() - TOP_DB)
+    return np.vstack((zcr, rmse, mel_db_to_mfcc(mel_db, n_mfcc)))
+
+def mel_db_to_mfcc(mel_db, n_mfcc=30):
+    """MFCCs from log-mel values, one column per frame (librosa.feature.mfcc's DCT)"""
+    import scipy.fft
+
+    return scipy.fft.dct(mel_db, axis=0, type=2, norm="ortho")[:n_mfcc]
+
+def frame_signals(data, sr):
+    """
+    The framewise inputs of frame_features: ZCR, RMS and the log-mel spectrogram in dB
+    without power_to_db's top_db floor, which depends on the span the features cover
+    Returns:
+        (n_frames,) ZCR, (n_frames,) RMS and (n_mels, n_frames) log-mel values
+    """
+    import librosa
+
+    pad = N_FFT // 2
+
+    # RMS and STFT: zero-padded centred frames (a strided view, no copy)
+    frames = librosa.util.frame(np.pad(data, pad, mode="constant"), frame_length=N_FFT, hop_length=HOP_LENGTH)
+    n_frames = frames.shape[1]
+
+    rmse = np.sqrt(np.mean(np.abs(frames) ** 2, axis=0))
+
+    spectrum = np.fft.rfft(frames * _hann_window()[:, np.newaxis], axis=0)
+    mel = librosa.filters.mel(sr=sr, n_fft=N_FFT) @ (np.abs(spectrum) ** 2)
+    mel_db = librosa.power_to_db(mel, top_db=None)
+
+    # ZCR: librosa pads with edge values and counts sign changes inside each frame
+    signs = np.signbit(np.where(np.abs(data) <= ZC_THRESHOLD, 0, data))
+    signs = np.pad(signs, pad, mode="edge")
+    changes = np.concatenate(([0], np.cumsum(signs[1:] != signs[:-1])))
+    starts = np.arange(n_frames) * HOP_LENGTH
+    zcr = (changes[starts + N_FFT - 1] - changes[starts]) / N_FFT
+
+    return zcr, rmse, mel_db
+
+_hann_cache = []
+
+def _hann_window():
+    import librosa
+
+    if not _hann_cache:
+        _hann_cache.append(librosa.filters.get_window("hann", N_FFT, fftbins=True))
+    return _hann_cache[0]
+
+def extract_features_fast(source, n_mfcc=30, res_type=RESAMPLE_TYPE):
+    """Same 32-dim features as extract_features_from_audio, computed with frame_features"""
+    import librosa
+
+    data, sr = librosa.load(source, duration=2.5, offset=0.6, res_type=res_type)
+    return frame_features(data, sr, n_mfcc=n_mfcc).mean(axis=1)
+
+def extract_window_features(source, window=2.5, hop=0.5, n_mfcc=30, hop_length=HOP_LENGTH):
+    """
+    Decode a recording once and compute one feature vector per sliding window
+    ZCR, RMS and log-mel values are computed framewise over the whole signal,
+    then averaged over the frames each window covers, taken from strided views
+    of the frame matrices. The log-mel values are floored TOP_DB below the
+    loudest value of each window (a sliding max), as frame_features floors a
+    single clip, so quiet windows of a loud recording aren't clipped against
+    the loud parts. The DCT is linear, so it is applied to the window means.
+    Window length and hop are rounded to whole frames.
+    Args:
+        source: Path or file-like object
+        window: Window length in seconds (the single-clip model uses 2.5 s)
+        hop: Distance between window starts in seconds
+    Returns:
+        (n_windows, 32) feature matrix, the window start times in seconds, and the
+        window length and hop in seconds after rounding to frames
+    """
+    import librosa
+
+    sliding_window_view = np.lib.stride_tricks.sliding_window_view
+
+    data, sr = librosa.load(source, res_type=RESAMPLE_TYPE)
+    zcr, rmse, mel_db = frame_signals(data, sr)
+
+    n_frames = mel_db.shape[1]
+    window_frames = min(n_frames, 1 + int(window * sr) // hop_length)
+    hop_frames = max(1, int(round(hop * sr / hop_length)))
+
+    levels = sliding_window_view(np.vstack((zcr, rmse)), window_frames, axis=1)[:, ::hop_frames].mean(axis=2)
+    n_windows = levels.shape[1]
+
+    floors = sliding_window_view(mel_db.max(axis=0), window_frames)[::hop_frames].max(axis=1) - TOP_DB
+    mel_windows = sliding_window_view(mel_db, window_frames, axis=1)[:, ::hop_frames]
+    window_db = np.empty((mel_db.shape[0], n_windows))
+    for start in range(0, n_windows, WINDOW_BLOCK):
+        block = slice(start, start + WINDOW_BLOCK)
+        window_db[:, block] = np.maximum(mel_windows[:, block], floors[block, np.newaxis]).mean(axis=2)
+
+    features = np.vstack((levels, mel_db_to_mfcc(window_db, n_mfcc))).T
+    hop_seconds = hop_frames * hop_length / sr
+    start_times = np.arange(n_windows) * hop_seconds
+
+    return features, start_times, window_frames * hop_length / sr, hop_seconds
+
+def safe_extract_features(source):
+    """
+    Process-pool entry point: extract features from a file path or raw bytes
+    Returns:
+        (features, None) on success, (None, error message) on failure
+    """
+    try:
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        if FEATURE_EXTRACTOR == "reference":
+            return extract_features_from_audio(source), None
+        return extract_features_fast(source), None
+    except Exception as e:
+        return None, str(e)
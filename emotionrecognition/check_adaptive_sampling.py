@@ -0,0 +1,72 @@
+"""
+Measure how far scene-change skipping (adaptive=true) drifts from full processing.
+
+Runs process_video on each video twice, classifying every sampled frame and
+with adaptive skipping, and compares the smoothed per-frame emotions, the
+emotion distribution and the dominant emotion.
+
+Usage:
+  python check_adaptive_sampling.py
+  python check_adaptive_sampling.py clips/*.mp4 --sample-rate 2 --threshold 5 --max-reuse 30
+"""
+import argparse
+import os
+import sys
+import time
+
+# Only the face model is needed
+os.environ.setdefault("ENABLED_MODELS", "face")
+
+import app_combined
+
+
+def run(path, sample_rate, adaptive):
+    start = time.perf_counter()
+    _, summary = app_combined.process_video(path, sample_rate=sample_rate, summary_only=True,
+                                            record_timeline=True, adaptive=adaptive)
+    return summary, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare adaptive and full video processing")
+    parser.add_argument("paths", nargs="*", default=["test_fear.mp4"], help="Videos to compare on")
+    parser.add_argument("--sample-rate", type=int, default=1, help="sample_rate for both runs")
+    parser.add_argument("--threshold", type=float, default=app_combined.SCENE_CHANGE_THRESHOLD,
+                        help="Scene-change threshold (default: SCENE_CHANGE_THRESHOLD)")
+    parser.add_argument("--max-reuse", type=int, default=app_combined.SCENE_CHANGE_MAX_REUSE,
+                        help="Maximum reuses of one prediction in a row (default: SCENE_CHANGE_MAX_REUSE)")
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="Minimum per-frame emotion agreement for the check to pass")
+    args = parser.parse_args()
+
+    if app_combined.face_model is None:
+        print("Facial model could not be loaded, see the log above")
+        return 1
+
+    app_combined.SCENE_CHANGE_THRESHOLD = args.threshold
+    app_combined.SCENE_CHANGE_MAX_REUSE = args.max_reuse
+
+    passed = True
+    for path in args.paths:
+        full, full_seconds = run(path, args.sample_rate, adaptive=False)
+        adaptive, adaptive_seconds = run(path, args.sample_rate, adaptive=True)
+
+        pairs = list(zip(full["frame_timeline"], adaptive["frame_timeline"]))
+        agreement = sum(a[2] == b[2] for a, b in pairs) / len(pairs) if pairs else 1.0
+        distribution_diff = max(abs(full["emotion_distribution"][label] - adaptive["emotion_distribution"][label])
+                                for label in app_combined.EMOTION_LABELS)
+        stats = adaptive["adaptive_sampling"]
+
+        print(f"{path}: {len(pairs)} frames, agreement {agreement:.1%}, "
+              f"max distribution diff {distribution_diff:.1f} points, "
+              f"dominant {full['dominant_emotion']} vs {adaptive['dominant_emotion']}, "
+              f"{stats['inferences_saved_percent']:.1f}% inferences saved, "
+              f"{full_seconds:.2f}s -> {adaptive_seconds:.2f}s")
+        passed &= agreement >= args.min_agreement and full["dominant_emotion"] == adaptive["dominant_emotion"]
+
+    print("Drift check passed" if passed else "Drift check FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Check that the fast audio feature extractor matches the reference one.
+
+Compares the 32-dim vectors from extract_features_fast and
+extract_features_from_audio and, when the audio model can be loaded, checks
+that scaler.pkl + the model give the same prediction for both.
+
+Also checks extract_window_features on a synthetic recording of a loud tone
+followed by quiet noise: the first fully quiet window must match
+extract_features_fast run on the same slice, so quiet windows of a loud
+recording aren't clipped against its loud part.
+
+Usage:
+  python check_audio_features.py
+  python check_audio_features.py recordings/*.wav --res-type soxr_lq
+"""
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+
+import audio_features
+
+
+def wav_bytes(data, sr):
+    buffer = io.BytesIO()
+    sf.write(buffer, data, sr, format="WAV")
+    buffer.seek(0)
+    return buffer
+
+
+def check_quiet_window(res_type, atol, sr=22050, seconds=10, quiet_from=5.0):
+    """Max |diff| between the first fully quiet timeline window and the same slice decoded on its own"""
+    rng = np.random.default_rng(0)
+    t = np.arange(sr * seconds) / sr
+    recording = np.where(t < quiet_from, 0.8 * np.sin(2 * np.pi * 440 * t),
+                         1e-3 * rng.standard_normal(t.size)).astype(np.float32)
+
+    features, start_times, window_seconds, _ = audio_features.extract_window_features(wav_bytes(recording, sr))
+    index = int(np.argmax(start_times >= quiet_from))
+    start = int(round(start_times[index] * sr))
+
+    # extract_features_fast skips the first 0.6 s, so the slice starts 0.6 s before the window
+    clip = recording[start - int(0.6 * sr):start + int(window_seconds * sr)]
+    expected = audio_features.extract_features_fast(wav_bytes(clip, sr), res_type=res_type)
+
+    diff = float(np.max(np.abs(features[index] - expected)))
+    print(f"Quiet window at {start_times[index]:.2f}s after a loud part: max |diff| = {diff:.3g}")
+    return diff <= atol
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fast and reference audio features")
+    parser.add_argument("paths", nargs="*", default=["test_fear.wav"], help="WAV files to compare on")
+    parser.add_argument("--res-type", default=audio_features.RESAMPLE_TYPE,
+                        help="Resampler for the fast extractor (default: AUDIO_RESAMPLE_TYPE)")
+    parser.add_argument("--rtol", type=float, default=1e-4,
+                        help="Maximum relative feature difference for the check to pass")
+    parser.add_argument("--window-atol", type=float, default=1.0,
+                        help="Maximum absolute difference for the quiet timeline window check")
+    parser.add_argument("--skip-model", action="store_true",
+                        help="Only compare features, don't load the audio model")
+    args = parser.parse_args()
+
+    reference = np.array([audio_features.extract_features_from_audio(path) for path in args.paths])
+    fast = np.array([audio_features.extract_features_fast(path, res_type=args.res_type) for path in args.paths])
+
+    relative_diff = np.abs(fast - reference) / np.maximum(np.abs(reference), 1e-6)
+    print(f"{len(args.paths)} files, max |diff| = {np.max(np.abs(fast - reference)):.3g}, "
+          f"max relative diff = {np.max(relative_diff):.3g}")
+    passed = bool(np.max(relative_diff) <= args.rtol)
+    passed &= check_quiet_window(args.res_type, args.window_atol)
+
+    if not args.skip_model:
+        os.environ.setdefault("ENABLED_MODELS", "audio")
+        import app_combined
+
+        if app_combined.audio_model is None:
+            print("Audio model could not be loaded, see the log above")
+            return 1
+
+        expected = app_combined.predict_audio_features(list(reference))
+        actual = app_combined.predict_audio_features(list(fast))
+        for path, (emotion, confidence), (fast_emotion, fast_confidence) in zip(args.paths, expected, actual):
+            match = "ok" if emotion == fast_emotion else "MISMATCH"
+            print(f"{path}: {emotion} ({confidence:.4f}) vs {fast_emotion} ({fast_confidence:.4f}) {match}")
+            passed &= emotion == fast_emotion
+
+    print("Parity check passed" if passed else "Parity check FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Export the Keras emotion models to TFLite and check them against the originals.
+
+Writes face_model.tflite and audio_model.tflite to TFLITE_MODEL_DIR, which
+app_combined.py loads when INFERENCE_BACKEND=tflite.
+
+Usage:
+  python export_models.py
+  python export_models.py --quantize float16
+  python export_models.py --quantize int8 --video test_fear.mp4 --audio test_fear.wav
+  python export_models.py --check-only
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# The export always starts from the Keras models, whatever the service is configured to use
+os.environ["INFERENCE_BACKEND"] = "keras"
+
+import cv2
+import tensorflow as tf
+
+import app_combined
+from inference_backend import TFLiteBackend, TFLITE_AUDIO_MODEL, TFLITE_FACE_MODEL
+
+
+def sample_video_frames(video_paths, max_frames=64):
+    """Return up to max_frames RGB frames spread evenly over the given videos"""
+    frames = []
+    per_video = max(1, max_frames // max(1, len(video_paths)))
+    for path in video_paths:
+        cap = cv2.VideoCapture(path)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        step = max(1, total_frames // per_video)
+        frame_count = 0
+        while cap.isOpened() and len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame_count % step == 0:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            frame_count += 1
+        cap.release()
+    return frames
+
+
+def audio_inputs(audio_paths):
+    """Scaled (n, 32, 1) audio model inputs for the given WAV files"""
+    features = [app_combined.extract_features_from_audio(path) for path in audio_paths]
+    return app_combined.scale_audio_features(features).astype(np.float32)
+
+
+def convert(model, quantize, representative_inputs=None):
+    """Convert a Keras model to a TFLite flatbuffer"""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantize == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        # Integer weights and activations, calibrated on the sample media;
+        # inputs and outputs stay float32 so callers don't change
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([x[np.newaxis]] for x in representative_inputs)
+
+    # The CNN-LSTM audio model may need TF kernels for ops without a builtin equivalent
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+    return converter.convert()
+
+
+def check_parity(name, keras_backend, tflite_backend, inputs, min_agreement):
+    """Compare Keras and TFLite outputs on the same inputs. Returns True if within tolerance."""
+    expected = keras_backend.predict(inputs)
+    actual = tflite_backend.predict(inputs)
+
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+
+    print(f"{name}: {len(inputs)} samples, max |diff| = {max_abs_diff:.6f}, top-1 agreement = {agreement:.1%}")
+    return agreement >= min_agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the emotion models to TFLite")
+    parser.add_argument("--output-dir", default=app_combined.TFLITE_MODEL_DIR,
+                        help="Directory for the .tflite files (default: TFLITE_MODEL_DIR)")
+    parser.add_argument("--quantize", choices=["none", "float16", "int8"], default="none",
+                        help="Post-training quantization applied to both models")
+    parser.add_argument("--video", nargs="+", default=["test_fear.mp4"],
+                        help="Videos used for int8 calibration and the parity check")
+    parser.add_argument("--audio", nargs="+", default=["test_fear.wav"],
+                        help="WAV files used for int8 calibration and the parity check")
+    parser.add_argument("--min-agreement", type=float, default=1.0,
+                        help="Minimum top-1 agreement with Keras for the parity check to pass")
+    parser.add_argument("--check-only", action="store_true",
+                        help="Skip the export and only run the parity check on existing files")
+    args = parser.parse_args()
+
+    if app_combined.face_model is None or app_combined.audio_model is None:
+        print("Keras models could not be loaded, see the log above")
+        return 1
+
+    face_inputs = app_combined.preprocess_batch(sample_video_frames(args.video))
+    audio_model_inputs = audio_inputs(args.audio)
+
+    face_path = os.path.join(args.output_dir, TFLITE_FACE_MODEL)
+    audio_path = os.path.join(args.output_dir, TFLITE_AUDIO_MODEL)
+
+    if not args.check_only:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for path, backend, inputs in ((face_path, app_combined.face_model, face_inputs),
+                                      (audio_path, app_combined.audio_model, audio_model_inputs)):
+            with open(path, "wb") as f:
+                f.write(convert(backend.model, args.quantize, inputs))
+            print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB, quantize={args.quantize})")
+
+    passed = check_parity("face_model", app_combined.face_model, TFLiteBackend(face_path),
+                          face_inputs, args.min_agreement)
+    passed &= check_parity("audio_model", app_combined.audio_model, TFLiteBackend(audio_path),
+                           audio_model_inputs, args.min_agreement)
+
+    print("Parity check passed" if passed else "Parity check FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import os
+import cv2
+import numpy as np
+
+# Frontal-face Haar cascade bundled with opencv-python
+DEFAULT_CASCADE = os.path.join(getattr(getattr(cv2, "data", None), "haarcascades", ""),
+                               "haarcascade_frontalface_default.xml")
+
+
+def box_iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes"""
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    intersection = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a[2] * a[3] + b[2] * b[3] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """
+    Finds faces with a Haar cascade every detect_interval frames and follows
+    them in between by template matching around their last position.
+    Both run on a greyscale copy of the frame downscaled to detect_width, so a
+    tracked frame costs one small resize plus a matchTemplate per face.
+    Detections are matched to existing tracks by IoU so faces keep their id.
+    """
+    def __init__(self, cascade_path=DEFAULT_CASCADE, detect_interval=10, detect_width=320,
+                 min_face_size=24, max_faces=4, match_threshold=0.6, iou_threshold=0.3):
+        if not hasattr(cv2, "CascadeClassifier"):
+            raise ValueError(f"OpenCV {cv2.__version__} has no CascadeClassifier, install opencv-python 4.x (see requirements.txt)")
+        self.detector = cv2.CascadeClassifier(cascade_path)
+        if self.detector.empty():
+            raise ValueError(f"Could not load the face detector from {cascade_path}")
+
+        self.detect_interval = max(1, int(detect_interval))
+        self.detect_width = detect_width
+        self.min_face_size = min_face_size
+        self.max_faces = max_faces
+        self.match_threshold = match_threshold
+        self.iou_threshold = iou_threshold
+
+        self.tracks = []  # dicts with id, box (in downscaled coordinates) and template
+        self.next_id = 0
+        self.frames = 0
+        self.detections = 0
+
+    def update(self, frame):
+        """
+        Advance to the next BGR frame
+        Returns:
+            List of (face id, (x, y, w, h)) in frame coordinates, largest face first
+        """
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.detect_width / width)
+        small = cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))),
+                           interpolation=cv2.INTER_AREA) if scale < 1.0 else frame
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        if self.frames % self.detect_interval == 0:
+            self._detect(gray)
+        else:
+            self._track(gray)
+        self.frames += 1
+
+        faces = []
+        for track in sorted(self.tracks, key=lambda t: t["box"][2] * t["box"][3], reverse=True):
+            x, y, w, h = track["box"]
+            faces.append((track["id"], (int(x / scale), int(y / scale), int(w / scale), int(h / scale))))
+        return faces
+
+    def stats(self):
+        return {"frames": self.frames, "detections": self.detections, "next_id": self.next_id}
+
+    def _detect(self, gray):
+        self.detections += 1
+        boxes = self.detector.detectMultiScale(cv2.equalizeHist(gray), scaleFactor=1.1, minNeighbors=5,
+                                               minSize=(self.min_face_size, self.min_face_size))
+        boxes = sorted((tuple(int(v) for v in box) for box in boxes), key=lambda b: b[2] * b[3],
+                       reverse=True)[:self.max_faces]
+
+        tracks = []
+        unmatched = list(self.tracks)
+        for box in boxes:
+            best = max(unmatched, key=lambda t: box_iou(t["box"], box), default=None)
+            if best is not None and box_iou(best["box"], box) >= self.iou_threshold:
+                unmatched.remove(best)
+                face_id = best["id"]
+            else:
+                face_id = self.next_id
+                self.next_id += 1
+            x, y, w, h = box
+            tracks.append({"id": face_id, "box": box, "template": gray[y:y + h, x:x + w].copy()})
+        self.tracks = tracks
+
+    def _track(self, gray):
+        tracks = []
+        for track in self.tracks:
+            x, y, w, h = track["box"]
+            margin_x, margin_y = w // 2, h // 2
+            x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+            region = gray[y0:y + h + margin_y, x0:x + w + margin_x]
+            if region.shape[0] < h or region.shape[1] < w:
+                continue
+
+            scores = cv2.matchTemplate(region, track["template"], cv2.TM_CCOEFF_NORMED)
+            _, score, _, (dx, dy) = cv2.minMaxLoc(scores)
+            if np.isfinite(score) and score >= self.match_threshold:
+                track["box"] = (x0 + dx, y0 + dy, w, h)
+                tracks.append(track)
+        self.tracks = tracks
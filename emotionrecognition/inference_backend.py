@@ -0,0 +1,163 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Supported values for the INFERENCE_BACKEND setting
+BACKENDS = ("keras", "tflite")
+
+TFLITE_FACE_MODEL = "face_model.tflite"
+TFLITE_AUDIO_MODEL = "audio_model.tflite"
+
+
+class KerasBackend:
+    """Runs a full Keras model"""
+    name = "keras"
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self.model = tf.keras.models.load_model(model_path)
+
+    def predict(self, batch):
+        """Return the model outputs for a batch as a NumPy array"""
+        return self.model.predict(batch, batch_size=len(batch), verbose=0)
+
+
+def _load_interpreter_class():
+    """Prefer the standalone tflite_runtime wheel, fall back to the copy bundled with TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteBackend:
+    """
+    Runs a model exported by export_models.py with the TFLite interpreter.
+    The interpreter is not thread-safe, so calls are serialized with a lock;
+    the input tensor is only re-allocated when the batch size changes.
+    """
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=None):
+        Interpreter = _load_interpreter_class()
+
+        self.model_path = model_path
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+
+        input_details = self.interpreter.get_input_details()[0]
+        self.input_index = input_details["index"]
+        self.input_dtype = input_details["dtype"]
+        self.batch_size = int(input_details["shape"][0])
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.lock = threading.Lock()
+
+    def predict(self, batch):
+        """Return the model outputs for a batch as a NumPy array"""
+        batch = np.asarray(batch, dtype=self.input_dtype)
+
+        with self.lock:
+            if batch.shape[0] != self.batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = batch.shape[0]
+
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+
+class MicroBatcher:
+    """
+    Collects single-sample requests from concurrent callers and runs them through
+    the model as one batch.
+    A background thread takes the first waiting request, then keeps collecting
+    until max_batch_size samples are queued or max_wait_ms has passed, runs one
+    forward pass and hands each caller its own row of the output.
+    """
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+        self.worker = None
+        self.batches = 0
+        self.samples = 0
+
+    def predict(self, sample):
+        """Run one sample (without batch dimension) and return its output row"""
+        future = Future()
+        self._start()
+        self.requests.put((sample, future))
+        return future.result()
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "samples": self.samples,
+            "mean_batch_size": self.samples / self.batches if self.batches else 0.0
+        }
+
+    def _start(self):
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self.worker.start()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the batch is full or the wait window closes"""
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            futures = [future for _, future in batch]
+            try:
+                outputs = self.predict_fn(np.stack([sample for sample, _ in batch]))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.samples += len(batch)
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
+
+
+def load_backend(kind, keras_path, tflite_dir, tflite_name, num_threads=None):
+    """
+    Load one model with the configured backend
+    Args:
+        kind: "keras" or "tflite"
+        keras_path: Path to the original Keras model
+        tflite_dir: Directory holding the models written by export_models.py
+        tflite_name: File name of this model inside tflite_dir
+        num_threads: Interpreter threads for the TFLite backend (None = runtime default)
+    """
+    if kind == "keras":
+        return KerasBackend(keras_path)
+    if kind == "tflite":
+        return TFLiteBackend(os.path.join(tflite_dir, tflite_name), num_threads=num_threads)
+    raise ValueError(f"Unknown inference backend '{kind}', expected one of {BACKENDS}")
@@ -0,0 +1,135 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, one series per label value"""
+    def __init__(self, name, help_text, label, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self.series = {}  # label value -> [bucket counts..., +Inf count], sum
+        self.lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self.series.items()}
+
+        for label_value, (counts, total) in sorted(series.items()):
+            labels = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter"""
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+# Process-wide metrics exposed on /metrics
+stage_seconds = Histogram("emotion_stage_seconds", "Time spent per processing stage", "stage")
+counters = {
+    "frames_decoded": Counter("emotion_frames_decoded_total", "Video frames decoded"),
+    "frames_inferred": Counter("emotion_frames_inferred_total", "Video frames classified by the face model"),
+    "bytes_uploaded": Counter("emotion_bytes_uploaded_total", "Bytes of uploaded media received"),
+    "video_jobs": Counter("emotion_video_jobs_total", "Videos processed"),
+}
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    lines = stage_seconds.render()
+    for counter in counters.values():
+        lines.extend(counter.render())
+    return "\n".join(lines) + "\n"
+
+
+class JobMetrics:
+    """
+    Stage timings and counters for one job. Everything recorded here is also
+    added to the process-wide histogram and counters. Safe to use from the
+    decode and inference threads at the same time.
+    """
+    def __init__(self):
+        self.stages = {}  # stage -> [count, total seconds]
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage, seconds):
+        stage_seconds.observe(stage, seconds)
+        with self.lock:
+            entry = self.stages.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def count(self, name, amount=1):
+        counters[name].inc(amount)
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def merge(self, snapshot):
+        """
+        Add a snapshot taken in another process (e.g. a parallel video chunk).
+        Its counters reach the process-wide counters; its stage totals only this
+        job, since the individual latencies aren't known here.
+        """
+        for name, amount in snapshot["counters"].items():
+            self.count(name, amount)
+        with self.lock:
+            for stage, stats in snapshot["stages"].items():
+                entry = self.stages.setdefault(stage, [0, 0.0])
+                entry[0] += stats["count"]
+                entry[1] += stats["total_seconds"]
+
+    def snapshot(self):
+        """Per-stage totals and counters, for processing_metadata"""
+        with self.lock:
+            return {
+                "stages": {stage: {"count": count,
+                                   "total_seconds": total,
+                                   "mean_ms": total / count * 1000.0 if count else 0.0}
+                           for stage, (count, total) in self.stages.items()},
+                "counters": dict(self.counts)
+            }
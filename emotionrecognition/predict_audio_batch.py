@@ -0,0 +1,79 @@
+"""
+Score many WAV files offline with the audio emotion model.
+
+Features are extracted in parallel across a process pool and all files are
+classified with one batched model pass, using the same label mapping as the
+/predict-audio endpoint.
+
+Usage:
+  python predict_audio_batch.py recordings/ extra.wav --workers 8 --output results.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+
+# Only the audio model is needed for offline scoring
+os.environ.setdefault("ENABLED_MODELS", "audio")
+
+import app_combined
+
+
+def collect_wav_files(paths):
+    """Expand directories into the WAV files they contain (recursively)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.wav"), recursive=True)))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict emotions for a batch of WAV files")
+    parser.add_argument("paths", nargs="+", help="WAV files or directories containing them")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Feature-extraction processes (default: AUDIO_POOL_WORKERS or one per CPU)")
+    parser.add_argument("--output", help="Write results to this .csv or .json file instead of stdout")
+    args = parser.parse_args()
+
+    if app_combined.audio_model is None:
+        print("Audio model could not be loaded, see the log above")
+        return 1
+
+    if args.workers:
+        app_combined.AUDIO_POOL_WORKERS = args.workers
+
+    files = collect_wav_files(args.paths)
+    if not files:
+        print("No WAV files found")
+        return 1
+
+    results = [{"file": path, **result}
+               for path, result in zip(files, app_combined.predict_audio_sources(files))]
+
+    if args.output and args.output.endswith(".csv"):
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["file", "emotion", "confidence", "error"])
+            writer.writeheader()
+            writer.writerows(results)
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        for result in results:
+            if "error" in result:
+                print(f"{result['file']}: error: {result['error']}")
+            else:
+                print(f"{result['file']}: {result['emotion']} ({result['confidence']:.2f})")
+
+    failed = sum("error" in result for result in results)
+    print(f"Scored {len(results) - failed}/{len(results)} files", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,17 @@
 import streamlit as st
-import numpy as np
-import joblib
+import dass21
+from dual_model import DualModelPredictor
 
-# Load the trained model and encoder
+# Load both trained models and their encoders
 @st.cache_resource
 def load_model():
-    model = joblib.load('best_model.pkl')
-    encoder = joblib.load('label_encoder.pkl')
-    return model, encoder
+    return DualModelPredictor.load()
 
-model, encoder = load_model()
+predictor = load_model()
 
 # Streamlit app title and description
 st.title("ML Model Prediction App")
-st.write("Enter values for the 21 features to predict the class.")
+st.write("Enter the 21 DASS-21 answers to score them and predict the class.")
 
 # Dropdown inputs for 21 features (values 0 to 3)
 feature_values = []
@@ -23,15 +21,21 @@ for i in range(1, 22):  # Features are indexed 1 to 21 for user clarity
 
 # Predict button
 if st.button("Predict"):
-    # Convert input features to numpy array
-    sample_input = np.array([feature_values])  # Shape (1, 21)
-    
-    # Model prediction
+    # Depression, anxiety and stress scores and severity bands
+    scores, severity = dass21.score(feature_values)
+    for name, result in dass21.score_dicts(scores, severity)[0].items():
+        st.write(f"{name.capitalize()}: {result['score']} ({result['severity']})")
+
+    # The model takes the 7 stress items
+    sample_input = dass21.model_features(feature_values)  # Shape (1, 7)
+
+    # Model prediction, both models in one call
     try:
-        encoded_prediction = model.predict(sample_input)  # Encoded prediction
-        decoded_prediction = encoder.inverse_transform(encoded_prediction)  # Decode to original label
-        
+        decoded_prediction, decoded_prediction_2, timings = predictor.predict(sample_input)
+
         # Display the result
         st.success(f"The predicted class is: {decoded_prediction[0]}")
+        st.success(f"The predicted doctor is: {decoded_prediction_2[0]}")
+        st.caption(f"Class model {timings['class'] * 1000:.1f} ms, doctor model {timings['doctor'] * 1000:.1f} ms")
     except Exception as e:
         st.error(f"An error occurred during prediction: {e}")
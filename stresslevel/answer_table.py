@@ -0,0 +1,73 @@
+import numpy as np
+
+NUM_FEATURES = 7
+NUM_ANSWERS = 4  # Each answer is 0, 1, 2 or 3
+
+# Weight of each answer in the base-4 index; the first answer is the most significant digit
+PLACE_VALUES = NUM_ANSWERS ** np.arange(NUM_FEATURES - 1, -1, -1)
+TABLE_SIZE = NUM_ANSWERS ** NUM_FEATURES
+
+
+def enumerate_answers():
+    """Every possible answer vector, shape (4^7, 7), row i being the vector with base-4 index i"""
+    index = np.arange(TABLE_SIZE)[:, np.newaxis]
+    return (index // PLACE_VALUES) % NUM_ANSWERS
+
+
+def answer_index(rows):
+    """Base-4 index of each answer vector in an (n, 7) array"""
+    return np.asarray(rows, dtype=np.int64) @ PLACE_VALUES
+
+
+def is_answer_space(rows):
+    """True if every value of an (n, 7) array is a whole number from 0 to 3"""
+    rows = np.asarray(rows)
+    return (rows.ndim == 2 and rows.shape[1] == NUM_FEATURES and
+            bool(np.all((rows >= 0) & (rows < NUM_ANSWERS) & (rows == np.round(rows)))))
+
+
+class AnswerTable:
+    """
+    Predictions of both stress models for the whole 4^7 answer space.
+    The encoded predictions are stored as uint8 codes indexed by the base-4
+    encoding of the answers, and decoded through the label encoders' classes,
+    so a lookup is two array indexing operations.
+    The classes are kept as fixed-width strings (every caller str()s the
+    predictions anyway), so the table saves and loads without pickling.
+    """
+    def __init__(self, class_codes, class_labels, doctor_codes, doctor_labels):
+        self.class_codes = class_codes
+        self.class_labels = class_labels
+        self.doctor_codes = doctor_codes
+        self.doctor_labels = doctor_labels
+
+    @classmethod
+    def build(cls, predictor):
+        """Predict every possible answer vector with one call to a DualModelPredictor"""
+        class_codes, doctor_codes, _ = predictor.predict_encoded(enumerate_answers().astype(float))
+        return cls(class_codes.astype(np.uint8), np.asarray(predictor.encoder.classes_).astype(str),
+                   doctor_codes.astype(np.uint8), np.asarray(predictor.encoder_2.classes_).astype(str))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["class_codes"], data["class_labels"], data["doctor_codes"], data["doctor_labels"])
+
+    def save(self, path):
+        np.savez_compressed(path, class_codes=self.class_codes, class_labels=self.class_labels,
+                            doctor_codes=self.doctor_codes, doctor_labels=self.doctor_labels)
+
+    def lookup(self, rows):
+        """Decoded class and doctor arrays for an (n, 7) array of answers (see is_answer_space)"""
+        index = answer_index(rows)
+        return self.class_labels[self.class_codes[index]], self.doctor_labels[self.doctor_codes[index]]
+
+    def check(self, predictor):
+        """Number of answer vectors where the table disagrees with the predictor's models"""
+        if len(self.class_codes) != TABLE_SIZE or len(self.doctor_codes) != TABLE_SIZE:
+            return TABLE_SIZE
+
+        live = AnswerTable.build(predictor)
+        table_class, table_doctor = self.class_labels[self.class_codes], self.doctor_labels[self.doctor_codes]
+        live_class, live_doctor = live.class_labels[live.class_codes], live.doctor_labels[live.doctor_codes]
+        return int(np.count_nonzero((table_class != live_class) | (table_doctor != live_doctor)))
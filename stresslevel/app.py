@@ -1,20 +1,58 @@
-from flask import Flask, request, jsonify
-import numpy as np
-import joblib
+from flask import Flask, Response, request, jsonify, stream_with_context
+import codecs
+import os
+import dass21
+from answer_table import AnswerTable, is_answer_space
+from batch_scoring import csv_feature_rows, result_csv, result_dicts, score_rows
+from dual_model import DualModelPredictor
 
 app = Flask(__name__)
 
-# Load the model and label encoder
-model = joblib.load('best_model.pkl')
-encoder = joblib.load('label_encoder.pkl')
-model_2 = joblib.load('best_model_2.pkl')
-encoder_2 = joblib.load('label_encoder_2.pkl')
+# Run the class and doctor models side by side on threads (false runs them one after the other)
+CONCURRENT_MODELS = os.getenv('CONCURRENT_MODELS', 'true').lower() == 'true'
+
+# Load both models and their label encoders
+predictor = DualModelPredictor.load(concurrent=CONCURRENT_MODELS)
+
+# Optional compiled mode: answer /predict from a table of both models' predictions for all
+# 4^7 answer vectors, prebuilt with build_answer_table.py or built here at startup
+USE_ANSWER_TABLE = os.getenv('USE_ANSWER_TABLE', 'false').lower() == 'true'
+ANSWER_TABLE_PATH = os.getenv('ANSWER_TABLE_PATH', 'answer_table.npz')
+
+def load_answer_table():
+    """Load the prebuilt table if it agrees with the loaded models, otherwise build it from them"""
+    if os.path.exists(ANSWER_TABLE_PATH):
+        try:
+            table = AnswerTable.load(ANSWER_TABLE_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            app.logger.warning(f"Could not load {ANSWER_TABLE_PATH} ({e}), rebuilding it")
+        else:
+            mismatches = table.check(predictor)
+            if mismatches == 0:
+                return table
+            app.logger.warning(f"{ANSWER_TABLE_PATH} disagrees with the models on {mismatches} inputs, rebuilding it")
+    return AnswerTable.build(predictor)
+
+answer_table = load_answer_table() if USE_ANSWER_TABLE else None
+
+# Rows validated and predicted together by /predict-batch and score_batch.py
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', 10000))
+
+def predict_matrix(features):
+    """Decoded class and doctor arrays for an (n, 7) array of valid features"""
+    if answer_table is not None and is_answer_space(features):
+        return answer_table.lookup(features)
+    classes, doctors, _ = predictor.predict(features)
+    return classes, doctors
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """
     Endpoint to predict the class based on input features.
-    Expects a JSON payload with 7 numeric inputs in the range [0-3].
+    Expects a JSON payload with 7 numeric inputs in the range [0-3] as "features", or a full
+    DASS-21 questionnaire of 21 answers as "answers". Answers are also scored on the
+    depression, anxiety and stress subscales and the 7 stress items are fed to the models.
+    When the models run, the response includes the seconds each one took as "model_seconds".
     """
     try:
         # Parse input JSON
@@ -22,26 +60,70 @@ def predict():
         if not input_data:
             return jsonify({"error": "No input data provided"}), 400
 
-        # Validate input length
-        features = input_data.get("features")
-        if len(features) != 7:
+        dass_scores = None
+        if "answers" in input_data:
+            try:
+                scores, severity = dass21.score(input_data["answers"])
+                features = dass21.model_features(input_data["answers"])[0].tolist()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            dass_scores = dass21.score_dicts(scores, severity)[0]
+        else:
+            features = input_data.get("features")
+
+        # Validate input length and convert features to a (1, 7) NumPy array
+        try:
+            sample_input = predictor.prepare(features)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if len(sample_input) != 1:
             return jsonify({"error": "Input must contain exactly 7 features"}), 400
-        
-        # Convert features to NumPy array
-        sample_input = np.array([features])  
 
-        # Make predictions
-        encoded_prediction = model.predict(sample_input)
-        decoded_prediction = encoder.inverse_transform(encoded_prediction).tolist()[0]
-        
-        encoded_prediction_2 = model_2.predict(sample_input)
-        decoded_prediction_2 = encoder_2.inverse_transform(encoded_prediction_2).tolist()[0]
+        timings = None
+        if answer_table is not None and is_answer_space(sample_input):
+            # Every answer vector is precomputed
+            classes, doctors = answer_table.lookup(sample_input)
+        else:
+            # Make predictions with both models
+            classes, doctors, timings = predictor.predict(sample_input)
+        decoded_prediction, decoded_prediction_2 = classes.tolist()[0], doctors.tolist()[0]
 
         # Convert results to Python native types and return
-        return jsonify({
+        result = {
             "predicted_class": str(decoded_prediction),
             "predicted_doctor": str(decoded_prediction_2)
-        })
+        }
+        if timings is not None:
+            result["model_seconds"] = timings
+        if dass_scores is not None:
+            result["dass21"] = dass_scores
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/predict-batch', methods=['POST'])
+def predict_batch():
+    """
+    Endpoint to predict the class and doctor for many questionnaires at once.
+    Accepts either a JSON payload {"features": [[7 values], ...]}, answered with JSON, or a
+    CSV body (Content-Type: text/csv) with 7 columns per row or a header naming Q1-Q7,
+    answered with a CSV that is streamed back chunk by chunk.
+    Rows that are not 7 numeric inputs in the range [0-3] get an error instead of a prediction.
+    """
+    try:
+        if request.mimetype == 'text/csv':
+            rows = csv_feature_rows(codecs.iterdecode(request.stream, 'utf-8'))
+            chunks = score_rows(rows, predict_matrix, BATCH_CHUNK_SIZE)
+            return Response(stream_with_context(result_csv(chunks)), mimetype='text/csv')
+
+        input_data = request.get_json(silent=True)
+        if not input_data or not isinstance(input_data.get("features"), list):
+            return jsonify({"error": "Expected a JSON payload with a list of feature rows or a text/csv body"}), 400
+
+        predictions = list(result_dicts(score_rows(input_data["features"], predict_matrix, BATCH_CHUNK_SIZE)))
+        return jsonify({"predictions": predictions})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
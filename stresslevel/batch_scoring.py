@@ -0,0 +1,120 @@
+import csv
+import io
+import itertools
+import numpy as np
+from answer_table import NUM_ANSWERS, NUM_FEATURES
+
+FEATURE_COLUMNS = [f"Q{i}" for i in range(1, NUM_FEATURES + 1)]
+ROW_ERROR = f"Row must contain {NUM_FEATURES} numeric features in the range [0-{NUM_ANSWERS - 1}]"
+RESULT_COLUMNS = ["row", "predicted_class", "predicted_doctor", "error"]
+
+
+def iter_chunks(iterable, chunk_size):
+    """Split an iterable into lists of at most chunk_size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def rows_to_matrix(rows):
+    """(n, 7) float array from a list of rows; rows of the wrong length or with non-numeric values become NaN"""
+    matrix = np.full((len(rows), NUM_FEATURES), np.nan)
+    complete = np.fromiter((isinstance(row, (list, tuple)) and len(row) == NUM_FEATURES for row in rows),
+                           dtype=bool, count=len(rows))
+    try:
+        matrix[complete] = np.array([row for row, ok in zip(rows, complete) if ok], dtype=float).reshape(-1, NUM_FEATURES)
+    except (TypeError, ValueError):
+        # Some value isn't a number, convert row by row to find out which
+        for i in np.flatnonzero(complete):
+            try:
+                matrix[i] = np.array(rows[i], dtype=float)
+            except (TypeError, ValueError):
+                pass
+    return matrix
+
+
+def valid_rows(matrix):
+    """Mask of the rows whose features are all numbers in [0-3]"""
+    return np.all(np.isfinite(matrix) & (matrix >= 0) & (matrix <= NUM_ANSWERS - 1), axis=1)
+
+
+def csv_feature_rows(lines):
+    """
+    Feature rows from CSV lines. A first line that isn't numeric is a header; if it
+    names Q1-Q7 those columns are used (so stress.csv can be re-scored as is),
+    otherwise every row must have exactly 7 columns.
+    """
+    reader = csv.reader(lines)
+    first = next(reader, None)
+    if first is None:
+        return
+
+    try:
+        [float(value) for value in first]
+        header = None
+    except ValueError:
+        header = [name.strip() for name in first]
+
+    if header is not None and all(column in header for column in FEATURE_COLUMNS):
+        indices = [header.index(column) for column in FEATURE_COLUMNS]
+        for row in reader:
+            yield [row[i] for i in indices] if len(row) == len(header) else row
+        return
+
+    if header is None:
+        yield first
+    yield from reader
+
+
+def score_rows(rows, predict_fn, chunk_size=10000):
+    """
+    Validate and score feature rows chunk by chunk, so memory stays flat for long streams
+    Args:
+        rows: Iterable of feature rows (numbers or numeric strings)
+        predict_fn: Takes a valid (n, 7) float array and returns the decoded class and doctor arrays
+        chunk_size: Rows converted, validated and predicted together
+    Yields:
+        One list per chunk of (row number, predicted class, predicted doctor, error) tuples
+    """
+    row_number = 0
+    for chunk in iter_chunks(rows, chunk_size):
+        matrix = rows_to_matrix(chunk)
+        valid = valid_rows(matrix)
+
+        classes = np.full(len(chunk), None, dtype=object)
+        doctors = np.full(len(chunk), None, dtype=object)
+        if valid.any():
+            predicted_classes, predicted_doctors = predict_fn(matrix[valid])
+            classes[valid] = [str(value) for value in np.asarray(predicted_classes).tolist()]
+            doctors[valid] = [str(value) for value in np.asarray(predicted_doctors).tolist()]
+        errors = np.where(valid, None, ROW_ERROR)
+
+        yield list(zip(range(row_number, row_number + len(chunk)), classes, doctors, errors))
+        row_number += len(chunk)
+
+
+def result_dicts(chunks):
+    """Flatten score_rows output into JSON-ready dicts, without the empty fields"""
+    for chunk in chunks:
+        for row, predicted_class, predicted_doctor, error in chunk:
+            if error is None:
+                yield {"row": row, "predicted_class": predicted_class, "predicted_doctor": predicted_doctor}
+            else:
+                yield {"row": row, "error": error}
+
+
+def result_csv(chunks):
+    """Render score_rows output as CSV text, one string for the header and one per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RESULT_COLUMNS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
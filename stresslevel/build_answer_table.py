@@ -0,0 +1,41 @@
+"""
+Precompute both stress models' predictions for every possible answer vector.
+
+Writes answer_table.npz, which app.py serves /predict from when
+USE_ANSWER_TABLE=true, and checks it against the live models.
+
+Usage:
+  python build_answer_table.py
+  python build_answer_table.py --check-only
+"""
+import argparse
+import sys
+import time
+
+from answer_table import AnswerTable, TABLE_SIZE
+from dual_model import DualModelPredictor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the stresslevel answer lookup table")
+    parser.add_argument("--output", default="answer_table.npz", help="Table file to write or check")
+    parser.add_argument("--check-only", action="store_true",
+                        help="Only compare an existing table with the models")
+    args = parser.parse_args()
+
+    predictor = DualModelPredictor.load()
+
+    if not args.check_only:
+        start = time.perf_counter()
+        AnswerTable.build(predictor).save(args.output)
+        print(f"Wrote {args.output}: {TABLE_SIZE} answer vectors in {time.perf_counter() - start:.2f}s")
+
+    # Check the table as the app will load it, not the one still in memory
+    table = AnswerTable.load(args.output)
+    mismatches = table.check(predictor)
+    print(f"{mismatches} of {TABLE_SIZE} answer vectors disagree with the models")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import numpy as np
+
+NUM_ITEMS = 21
+SUBSCALES = ("depression", "anxiety", "stress")
+
+# Item numbers (1-21, as printed on the DASS-21 form) belonging to each subscale
+SUBSCALE_ITEMS = {
+    "depression": (3, 5, 10, 13, 16, 17, 21),
+    "anxiety": (2, 4, 7, 9, 15, 19, 20),
+    "stress": (1, 6, 8, 11, 12, 14, 18),
+}
+
+# DASS-21 sums are doubled to give the final score the cut-offs apply to
+SCORE_MULTIPLIER = 2
+
+SEVERITY_LABELS = np.array(["Normal", "Mild", "Moderate", "Severe", "Extremely Severe"])
+
+# Lowest final score of Mild, Moderate, Severe and Extremely Severe, one row per subscale
+SEVERITY_CUTOFFS = np.array([
+    [10, 14, 21, 28],  # depression
+    [8, 10, 15, 20],   # anxiety
+    [15, 19, 26, 34],  # stress
+])
+
+# (21, 3) weights turning a response into the three final scores with one matrix product
+ITEM_WEIGHTS = np.zeros((NUM_ITEMS, len(SUBSCALES)), dtype=np.int64)
+for column, name in enumerate(SUBSCALES):
+    ITEM_WEIGHTS[np.array(SUBSCALE_ITEMS[name]) - 1, column] = SCORE_MULTIPLIER
+
+# The stress models were trained on the 7 stress items, in form order, as Q1-Q7
+MODEL_ITEMS = np.array(SUBSCALE_ITEMS["stress"]) - 1
+
+
+def validate_answers(answers):
+    """
+    Check a batch of responses
+    Args:
+        answers: (n, 21) array-like, or a single response of 21 answers
+    Returns:
+        (n, 21) int64 array
+    Raises:
+        ValueError if a response doesn't have 21 answers or an answer isn't 0, 1, 2 or 3
+    """
+    answers = np.asarray(answers)
+    if answers.ndim == 1:
+        answers = answers[np.newaxis]
+    if answers.ndim != 2 or answers.shape[1] != NUM_ITEMS:
+        raise ValueError(f"Each questionnaire must contain exactly {NUM_ITEMS} answers")
+    if not np.issubdtype(answers.dtype, np.number) or np.any((answers < 0) | (answers > 3) | (answers != np.round(answers))):
+        raise ValueError("Answers must be whole numbers in the range [0-3]")
+    return answers.astype(np.int64)
+
+
+def score(answers):
+    """
+    Final subscale scores and severity bands for a batch of responses
+    Returns:
+        (n, 3) final scores and (n, 3) indices into SEVERITY_LABELS, columns in SUBSCALES order
+    """
+    scores = validate_answers(answers) @ ITEM_WEIGHTS
+    severity = np.sum(scores[:, :, np.newaxis] >= SEVERITY_CUTOFFS, axis=2)
+    return scores, severity
+
+
+def model_features(answers):
+    """The (n, 7) stress-item answers the stress models take as Q1-Q7"""
+    return validate_answers(answers)[:, MODEL_ITEMS]
+
+
+def score_dicts(scores, severity):
+    """One {"depression": {"score", "severity"}, ...} dict per response, from score()"""
+    labels = SEVERITY_LABELS[severity].tolist()
+    return [{name: {"score": value, "severity": label}
+             for name, value, label in zip(SUBSCALES, row_scores, row_labels)}
+            for row_scores, row_labels in zip(scores.tolist(), labels)]
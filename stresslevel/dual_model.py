@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+from answer_table import NUM_FEATURES
+
+
+class DualModelPredictor:
+    """
+    The class and doctor models behind one predict call.
+    The input is validated and converted to a float array once and both models
+    run on that same array; with concurrent=True the doctor model runs on a
+    worker thread while the class model runs on the caller's, which overlaps
+    the parts of sklearn's predict that release the GIL.
+    """
+    def __init__(self, model, encoder, model_2, encoder_2, concurrent=True, max_workers=None):
+        self.model = model
+        self.encoder = encoder
+        self.model_2 = model_2
+        self.encoder_2 = encoder_2
+        self.executor = ThreadPoolExecutor(max_workers=max_workers) if concurrent else None
+
+    @classmethod
+    def load(cls, model_path='best_model.pkl', encoder_path='label_encoder.pkl',
+             model_2_path='best_model_2.pkl', encoder_2_path='label_encoder_2.pkl', **kwargs):
+        return cls(joblib.load(model_path), joblib.load(encoder_path),
+                   joblib.load(model_2_path), joblib.load(encoder_2_path), **kwargs)
+
+    @staticmethod
+    def prepare(features):
+        """
+        (n, 7) float array from one row of 7 features or a list of rows
+        Raises:
+            ValueError if a row doesn't have 7 numeric features
+        """
+        try:
+            sample_input = np.asarray(features, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError("Features must be numeric")
+        if sample_input.ndim == 1:
+            sample_input = sample_input[np.newaxis]
+        if sample_input.ndim != 2 or sample_input.shape[1] != NUM_FEATURES:
+            raise ValueError(f"Input must contain exactly {NUM_FEATURES} features")
+        return sample_input
+
+    @staticmethod
+    def _timed_predict(model, sample_input):
+        start = time.perf_counter()
+        codes = model.predict(sample_input)
+        return codes, time.perf_counter() - start
+
+    def predict_encoded(self, sample_input):
+        """
+        Encoded predictions of both models for an array from prepare()
+        Returns:
+            class codes, doctor codes and {"class": seconds, "doctor": seconds}
+        """
+        if self.executor is not None:
+            future = self.executor.submit(self._timed_predict, self.model_2, sample_input)
+            codes, class_seconds = self._timed_predict(self.model, sample_input)
+            codes_2, doctor_seconds = future.result()
+        else:
+            codes, class_seconds = self._timed_predict(self.model, sample_input)
+            codes_2, doctor_seconds = self._timed_predict(self.model_2, sample_input)
+        return codes, codes_2, {"class": class_seconds, "doctor": doctor_seconds}
+
+    def predict(self, features):
+        """
+        Decoded predictions of both models
+        Returns:
+            class array, doctor array and the per-model timings of predict_encoded()
+        """
+        codes, codes_2, timings = self.predict_encoded(self.prepare(features))
+        return self.encoder.inverse_transform(codes), self.encoder_2.inverse_transform(codes_2), timings
@@ -0,0 +1,64 @@
+"""
+Score a cohort of questionnaires offline with both stress models.
+
+Reads an N x 7 matrix of answers from a CSV file (or stdin), either with 7
+columns per row or with a header naming Q1-Q7, or from a JSON file holding a
+list of rows, and writes row, predicted_class, predicted_doctor, error as CSV.
+Rows are processed in chunks, so memory stays flat for very large files.
+
+Usage:
+  python score_batch.py stress.csv --output scored.csv
+  cat answers.csv | python score_batch.py - > scored.csv
+  python score_batch.py answers.json --chunk-size 50000
+"""
+import argparse
+import json
+import sys
+
+import app
+from batch_scoring import csv_feature_rows, result_csv, score_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict stress class and doctor for a batch of questionnaires")
+    parser.add_argument("input", help="CSV or .json file with the answers, or - for CSV on stdin")
+    parser.add_argument("--output", help="Write the results to this CSV file instead of stdout")
+    parser.add_argument("--chunk-size", type=int, default=app.BATCH_CHUNK_SIZE,
+                        help="Rows validated and predicted together (default: BATCH_CHUNK_SIZE)")
+    args = parser.parse_args()
+
+    if args.input.endswith(".json"):
+        with open(args.input) as f:
+            data = json.load(f)
+        rows = data["features"] if isinstance(data, dict) else data
+        source = None
+    else:
+        source = sys.stdin if args.input == "-" else open(args.input, newline="")
+        rows = csv_feature_rows(source)
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    scored = failed = 0
+
+    def count(chunks):
+        nonlocal scored, failed
+        for chunk in chunks:
+            errors = sum(error is not None for _, _, _, error in chunk)
+            failed += errors
+            scored += len(chunk) - errors
+            yield chunk
+
+    try:
+        for text in result_csv(count(score_rows(rows, app.predict_matrix, args.chunk_size))):
+            output.write(text)
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Scored {scored}/{scored + failed} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())